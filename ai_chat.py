@@ -0,0 +1,157 @@
+import time
+
+from conversation import DEFAULT_HISTORY_TOKENS, Conversation
+from ollama_client import get_client
+
+# How long Ollama keeps the model loaded after a request. Windows refresh it periodically
+# (KEEP_ALIVE_REFRESH_MS), so the model stays resident while one is open and unloads after.
+DEFAULT_KEEP_ALIVE = "10m"
+KEEP_ALIVE_REFRESH_MS = 5 * 60 * 1000
+
+
+def model_installed(client, model_name):
+    names = {model.model for model in client.list().models}
+    # "llama3.1" is listed as "llama3.1:latest"
+    return model_name in names or f"{model_name}:latest" in names
+
+
+def warm_up_model(client, model_name, pull=False, keep_alive=DEFAULT_KEEP_ALIVE):
+    """Make sure a model is installed and loaded, and return a short status message.
+
+    The model is pulled first when it is missing and `pull` is allowed; the pull
+    is streamed, so the client's timeout bounds the wait for each progress
+    update rather than the whole download. Loading
+    uses a chat request without messages, which loads the model without
+    generating anything and sets how long it stays resident.
+    """
+    started = time.perf_counter()
+    pulled = ""
+    if not model_installed(client, model_name):
+        if not pull:
+            return f"{model_name} is not installed; run 'ollama pull {model_name}'"
+        for _ in client.pull(model_name, stream=True):
+            pass
+        pulled = "pulled and "
+    client.chat(model=model_name, messages=[], keep_alive=keep_alive)
+    return f"{model_name} {pulled}ready ({time.perf_counter() - started:.1f}s)"
+
+
+# AIChat Class for interacting with the AI model
+class AIChat:
+    def __init__(self, model_name, timeout=None, cache=None, history_tokens=DEFAULT_HISTORY_TOKENS,
+                 summarize_history=False, keep_alive=DEFAULT_KEEP_ALIVE, host=None):
+        self.model_name = model_name
+        self.timeout = timeout  # HTTP timeout in seconds so a stuck request frees its worker thread
+        self.host = host  # Ollama server; None uses ollama_client.configure() or OLLAMA_HOST
+        self.cache = cache  # Optional ResponseCache; repeated prompts with the same state skip the model
+        self.keep_alive = keep_alive  # Sent with every request so the model is not unloaded in between
+        # History for chat()/stream_chat(); generate_response() and stream_response() are one-shot
+        self.conversation = Conversation(
+            max_tokens=history_tokens, summarize=self.summarize_turns if summarize_history else None
+        )
+
+    def get_client(self):
+        # Shared with every other AIChat using the same host and timeout, so connections are reused
+        return get_client(self.timeout, self.host)
+
+    def cached_response(self, prompt, state=""):
+        if self.cache is None:
+            return None
+        return self.cache.get(self.model_name, prompt, state)
+
+    def generate_response(self, prompt, state=""):
+        """Generate a response from the AI model using a prompt.
+
+        `state` identifies the data the prompt refers to (e.g. BudgetManager.state_hash())
+        and is part of the cache key.
+        """
+        try:
+            return self.complete(prompt, state)
+        except Exception as e:
+            return f"An error occurred while generating the response: {e}"
+
+    def complete(self, prompt, state=""):
+        """Like generate_response(), but errors are raised instead of returned as text."""
+        cached = self.cached_response(prompt, state)
+        if cached is not None:
+            return cached
+        response = self.get_client().chat(
+            model=self.model_name, messages=[{"role": "user", "content": prompt}], keep_alive=self.keep_alive
+        )
+        content = response["message"]["content"]
+        if self.cache is not None:
+            self.cache.put(self.model_name, prompt, content, state)
+        return content
+
+    def stream_response(self, prompt, state=""):
+        """Yield the response text chunk by chunk as the model generates it.
+
+        Unlike generate_response() errors are raised, since part of the answer
+        may already have been shown. A cached response is yielded in one piece,
+        and only streams that run to completion are cached.
+        """
+        cached = self.cached_response(prompt, state)
+        if cached is not None:
+            yield cached
+            return
+
+        stream = self.get_client().chat(
+            model=self.model_name, messages=[{"role": "user", "content": prompt}], stream=True,
+            keep_alive=self.keep_alive,
+        )
+        parts = []
+        for chunk in stream:
+            parts.append(chunk["message"]["content"])
+            yield parts[-1]
+        if self.cache is not None:
+            self.cache.put(self.model_name, prompt, "".join(parts), state)
+
+    def chat(self, prompt, system_prompt=None):
+        """Send a prompt as the next turn of the conversation and return the response.
+
+        `system_prompt` replaces the conversation's own for this turn only.
+        """
+        response = self.get_client().chat(
+            model=self.model_name, messages=self.conversation.messages_for(prompt, system_prompt),
+            keep_alive=self.keep_alive,
+        )
+        content = response["message"]["content"]
+        self.conversation.add_exchange(prompt, content)
+        return content
+
+    def stream_chat(self, prompt, system_prompt=None):
+        """Like chat(), but yields the response chunk by chunk. Cancelled turns are not remembered."""
+        stream = self.get_client().chat(
+            model=self.model_name, messages=self.conversation.messages_for(prompt, system_prompt), stream=True,
+            keep_alive=self.keep_alive,
+        )
+        parts = []
+        for chunk in stream:
+            parts.append(chunk["message"]["content"])
+            yield parts[-1]
+        self.conversation.add_exchange(prompt, "".join(parts))
+
+    def summarize_turns(self, summary, messages):
+        """Fold dropped conversation turns into the running summary (used when trimming history)."""
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        prompt = (
+            "Update the summary of a conversation with the turns below. Keep the facts, numbers and "
+            f"decisions, in at most five sentences.\n\nCurrent summary:\n{summary or '(none)'}\n\n"
+            f"New turns:\n{transcript}"
+        )
+        try:
+            response = self.get_client().chat(
+                model=self.model_name, messages=[{"role": "user", "content": prompt}], keep_alive=self.keep_alive
+            )
+            return response["message"]["content"]
+        except Exception as e:
+            print(f"Could not summarize the conversation history: {e}")
+            return summary
+
+    def warm_up(self, pull=False):
+        """Load the model ahead of the first question (see warm_up_model). Blocks; run it on a worker."""
+        return warm_up_model(self.get_client(), self.model_name, pull, self.keep_alive)
+
+    def reset_conversation(self):
+        """Reset the conversation with the AI model."""
+        self.conversation.reset()
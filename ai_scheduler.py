@@ -0,0 +1,103 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+
+PRIORITY_INTERACTIVE = 0  # A request the user is waiting for
+PRIORITY_BACKGROUND = 10  # Prefetches, warm-ups and other work nobody is looking at yet
+DEFAULT_MAX_CONCURRENT = 2  # A local Ollama server handles few generations at once (OLLAMA_NUM_PARALLEL)
+
+
+class AIScheduler:
+    """A worker pool for model calls that runs the most urgent request first.
+
+    Works like a ThreadPoolExecutor whose queue is ordered by priority (lower
+    runs first, FIFO within a priority). At most `max_concurrent` calls run at
+    once, and background calls may only use `background_limit` of those slots,
+    so a request the user is waiting for never queues behind a batch of
+    prefetches. Several AIRunners can share one scheduler to share that cap.
+    """
+
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, background_limit=None, name="ai"):
+        self.max_concurrent = max_concurrent
+        if background_limit is None:
+            background_limit = max(max_concurrent - 1, 1)
+        self.background_limit = background_limit
+        self.queue = []  # Heap of (priority, sequence, future, func, args, kwargs)
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.running_background = 0
+        self.closed = False
+        self.workers = [
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(max_concurrent)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, func, *args, priority=PRIORITY_INTERACTIVE, **kwargs):
+        """Queue func(*args, **kwargs) and return a Future for its result.
+
+        Cancelling the future before a worker picks it up removes it from the queue.
+        """
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Cannot submit to a scheduler that has been shut down")
+            heapq.heappush(self.queue, (priority, next(self.sequence), future, func, args, kwargs))
+            self.condition.notify()
+        return future
+
+    @property
+    def pending(self):
+        """Number of calls waiting for a worker."""
+        with self.condition:
+            return sum(not item[2].cancelled() for item in self.queue)
+
+    def _next(self):
+        # Called with the condition held. Returns the most urgent runnable item, or None.
+        while self.queue and self.queue[0][2].cancelled():
+            heapq.heappop(self.queue)
+        if not self.queue:
+            return None
+        if self.queue[0][0] < PRIORITY_BACKGROUND or self.running_background < self.background_limit:
+            return heapq.heappop(self.queue)
+        return None
+
+    def _work(self):
+        while True:
+            with self.condition:
+                item = self._next()
+                while item is None and not self.closed:
+                    self.condition.wait()
+                    item = self._next()
+                if item is None:
+                    return
+                priority, _, future, func, args, kwargs = item
+                background = priority >= PRIORITY_BACKGROUND
+                if background:
+                    self.running_background += 1
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = func(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                if background:
+                    with self.condition:
+                        self.running_background -= 1
+                        # A background call may have been waiting for this slot
+                        self.condition.notify_all()
+
+    def shutdown(self, cancel_futures=True):
+        """Stop the workers once the running calls return, cancelling the queued ones."""
+        with self.condition:
+            self.closed = True
+            if cancel_futures:
+                for item in self.queue:
+                    item[2].cancel()
+                self.queue.clear()
+            self.condition.notify_all()
@@ -0,0 +1,217 @@
+import queue
+import time
+
+from ai_scheduler import PRIORITY_INTERACTIVE, AIScheduler
+
+DEFAULT_TIMEOUT = 120  # Seconds before a request is given up on; CPU-only models can take a minute
+FRAME_MS = 16  # Poll interval while a response is streaming, so tokens appear once per frame
+
+
+class AITask:
+    """A model request running on a worker thread.
+
+    The state moves from "pending" to one of "done", "failed", "timed_out" or
+    "cancelled". Only the first transition counts, so a response that arrives
+    after a cancel or a timeout is dropped instead of overwriting newer output.
+    """
+
+    def __init__(self, timeout, on_done, on_error, on_status, on_token=None, key=None):
+        self.future = None
+        self.key = key
+        self.timeout = timeout
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_status = on_status
+        self.on_token = on_token
+        self.chunks = queue.Queue() if on_token is not None else None  # Filled by the worker when streaming
+        self.started = time.perf_counter()
+        self.last_activity = self.started  # Reset when a worker picks the request up, so queueing is not a timeout
+        self.running = False  # Set once a worker starts the call
+        self.first_token_at = None
+        self.state = "pending"
+
+    @property
+    def streaming(self):
+        return self.chunks is not None
+
+    @property
+    def pending(self):
+        return self.state == "pending"
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def time_to_first_token(self):
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    def timing_summary(self):
+        """E.g. "Answered in 3.2s (first token after 0.4s)", for a status line."""
+        if self.time_to_first_token is None:
+            return f"Answered in {self.elapsed:.1f}s"  # Not streamed, or answered from the cache
+        return f"Answered in {self.elapsed:.1f}s (first token after {self.time_to_first_token:.1f}s)"
+
+    def cancel(self):
+        """Stop waiting for the response.
+
+        A streaming request stops reading at the next token; a blocking one keeps
+        running on its worker but the result is ignored.
+        """
+        if self.pending:
+            self.state = "cancelled"
+            self.future.cancel()
+
+
+class AIRunner:
+    """Runs blocking AI calls off the Tk main thread and delivers the results through after().
+
+    Callbacks are always invoked on the Tk thread, so they may touch widgets:
+    on_done(result) on success, on_error(exception) on failure or timeout, and
+    on_status(task) on every poll while the request is pending, e.g. to show a
+    "Thinking..." indicator with the elapsed time. Streaming requests also get
+    on_token(text) with every token that arrived since the previous frame.
+
+    Requests run on an AIScheduler, by default one of `max_workers` workers
+    owned by this runner; pass a shared scheduler so several runners split the
+    same model capacity. `priority` orders queued requests, and submitting with
+    a `key` cancels the request still pending under that key, so a superseded
+    prompt stops using the model as soon as the new one is sent.
+    """
+
+    def __init__(self, root, max_workers=2, poll_ms=50, timeout=DEFAULT_TIMEOUT, scheduler=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.timeout = timeout
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler or AIScheduler(max_concurrent=max_workers)
+        self.tasks = []
+        self.poll_job = None
+
+    def submit(self, func, *args, on_done, on_error=None, on_status=None, timeout=None,
+               priority=PRIORITY_INTERACTIVE, key=None, **kwargs):
+        """Call func(*args, **kwargs) on a worker thread and return its AITask."""
+        task = AITask(timeout or self.timeout, on_done, on_error, on_status, key=key)
+        return self._start(task, self._call, priority, task, func, args, kwargs)
+
+    def submit_stream(self, func, *args, on_token, on_done, on_error=None, on_status=None, timeout=None,
+                      priority=PRIORITY_INTERACTIVE, key=None, **kwargs):
+        """Iterate the generator func(*args, **kwargs) on a worker thread, streaming its text chunks.
+
+        on_token receives the batched chunks once per frame and on_done the full
+        text. For streams the timeout counts from the last chunk received, so a
+        long answer that keeps producing tokens is never cut off.
+        """
+        task = AITask(timeout or self.timeout, on_done, on_error, on_status, on_token, key=key)
+        return self._start(task, self._consume, priority, task, func, args, kwargs)
+
+    @staticmethod
+    def _call(task, func, args, kwargs):
+        task.last_activity = time.perf_counter()
+        task.running = True
+        return func(*args, **kwargs)
+
+    @staticmethod
+    def _consume(task, func, args, kwargs):
+        # Runs on the worker thread; widgets are only touched from _poll
+        task.last_activity = time.perf_counter()
+        task.running = True
+        if not task.pending:
+            return ""  # Cancelled while it was queued
+        parts = []
+        stream = func(*args, **kwargs)
+        try:
+            for chunk in stream:
+                if not task.pending:
+                    break
+                parts.append(chunk)
+                task.chunks.put(chunk)
+        finally:
+            # Closing the generator closes the HTTP response of a cancelled stream
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        return "".join(parts)
+
+    def _start(self, task, worker, priority, *args):
+        if task.key is not None:
+            for other in self.tasks:
+                if other.key == task.key:
+                    other.cancel()
+        task.future = self.scheduler.submit(worker, *args, priority=priority)
+        self.tasks.append(task)
+        if task.on_status is not None:
+            task.on_status(task)
+        if self.poll_job is None:
+            self.poll_job = self.root.after(self._interval(), self._poll)
+        return task
+
+    def _interval(self):
+        return FRAME_MS if any(task.streaming for task in self.tasks) else self.poll_ms
+
+    def _poll(self):
+        self.poll_job = None
+        # Callbacks may submit follow-up requests, so iterate over a copy
+        for task in list(self.tasks):
+            if not task.pending:
+                continue
+            # Checked before draining: once the worker has returned, every chunk is already queued
+            done = task.future.done()
+            if task.streaming:
+                self._deliver_tokens(task)
+                if not task.pending:
+                    continue  # on_token cancelled it
+            if done:
+                self._finish(task)
+            elif task.running and time.perf_counter() - task.last_activity > task.timeout:
+                task.state = "timed_out"
+                self._report_error(task, TimeoutError(f"No response from the model after {task.timeout:.0f} seconds."))
+            elif task.on_status is not None:
+                task.on_status(task)
+
+        self.tasks = [task for task in self.tasks if task.pending]
+        if self.tasks and self.poll_job is None:
+            self.poll_job = self.root.after(self._interval(), self._poll)
+
+    def _deliver_tokens(self, task):
+        """Hand everything streamed since the last frame to on_token in one widget update."""
+        batch = []
+        while True:
+            try:
+                batch.append(task.chunks.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            task.last_activity = time.perf_counter()
+            if task.first_token_at is None:
+                task.first_token_at = task.last_activity
+            task.on_token("".join(batch))
+
+    def _finish(self, task):
+        try:
+            result = task.future.result()
+        except Exception as e:
+            task.state = "failed"
+            self._report_error(task, e)
+        else:
+            task.state = "done"
+            task.on_done(result)
+
+    def _report_error(self, task, error):
+        if task.on_error is not None:
+            task.on_error(error)
+        else:
+            print(f"AI request failed: {error}")
+
+    def cancel_all(self):
+        for task in self.tasks:
+            task.cancel()
+
+    def shutdown(self):
+        """Drop pending requests and stop polling. Worker threads end when their calls return."""
+        self.cancel_all()
+        if self.poll_job is not None:
+            self.root.after_cancel(self.poll_job)
+            self.poll_job = None
+        if self.owns_scheduler:
+            self.scheduler.shutdown()
@@ -0,0 +1,159 @@
+import functools
+import time
+
+from ai_scheduler import PRIORITY_BACKGROUND, AIScheduler
+from ai_tasks import AIRunner
+from budget_context import DEFAULT_CONTEXT_TOKENS, build_budget_context
+
+TIP_CATEGORIES = ("budget", "savings", "investment", "retirement", "debt")
+
+
+def tip_prompts(budget_manager, retirement_age=65, max_context_tokens=DEFAULT_CONTEXT_TOKENS):
+    """Return the prompt for every tip category: a compact budget summary followed by the question."""
+    context = build_budget_context(budget_manager, max_context_tokens, retirement_age)
+    questions = {
+        "budget": "Can you suggest some tips for better budgeting?",
+        "savings": "Can you suggest ways to increase my savings rate?",
+        "investment": "Can you suggest some low-risk investment strategies to grow my savings over time?",
+        "retirement": (
+            f"I would like to retire at {retirement_age}. "
+            "Can you provide some tips on how to better prepare for retirement?"
+        ),
+        "debt": "Can you suggest strategies to manage and pay off my debt effectively?",
+    }
+    return {category: f"My budget:\n{context}\n\n{question}" for category, question in questions.items()}
+
+
+class TipPrefetcher:
+    """Generates the tip categories in the background once the budget stops changing.
+
+    The budget's version is checked every `check_ms`. When it has been unchanged
+    for `idle_ms` and no tips exist for it yet, every category is requested at
+    background priority on a pool of `max_concurrent` workers, or on the shared
+    `scheduler` if one is given, so a local model server is not flooded and
+    questions the user asks meanwhile go first.
+    Results are kept per category until the budget changes again, at which point
+    prefetches still in flight are cancelled and their answers dropped.
+    Responses also go through AIChat's cache, so a tip button asking the same
+    prompt later gets the answer from there too.
+    """
+
+    def __init__(self, root, ai_chat, budget_manager, categories=TIP_CATEGORIES, max_concurrent=2,
+                 idle_ms=2000, check_ms=500, scheduler=None):
+        self.root = root
+        self.ai_chat = ai_chat
+        self.budget_manager = budget_manager
+        self.categories = categories
+        self.idle_ms = idle_ms
+        self.check_ms = check_ms
+        # A pool of its own only ever runs prefetches, so they may use every worker of it
+        self.own_scheduler = None
+        if scheduler is None:
+            scheduler = self.own_scheduler = AIScheduler(max_concurrent, background_limit=max_concurrent, name="tips")
+        self.runner = AIRunner(root, scheduler=scheduler)
+        self.version = None  # Budget version the results and tasks below belong to
+        self.results = {}  # Category -> response
+        self.tasks = {}  # Category -> AITask still running
+        self.waiters = {}  # Category -> callbacks waiting for a running task
+        self.seen_version = None
+        self.changed_at = None
+        self.check_job = None
+
+    @property
+    def running(self):
+        return self.check_job is not None
+
+    def start(self):
+        if not self.running:
+            self._check()
+
+    def stop(self):
+        """Stop watching the budget and drop the prefetched tips.
+
+        Callers still waiting for a tip get None, so they can ask for it themselves.
+        """
+        if self.check_job is not None:
+            self.root.after_cancel(self.check_job)
+            self.check_job = None
+        self._discard()
+
+    def shutdown(self):
+        """Stop for good, e.g. when the window closes. Waiting callers are dropped, not called."""
+        self.waiters.clear()
+        self.stop()
+        self.runner.shutdown()
+        if self.own_scheduler is not None:
+            self.own_scheduler.shutdown()
+
+    def _check(self):
+        version = self.budget_manager.version
+        now = time.perf_counter()
+        if version != self.seen_version:
+            # Changed since the last check: wait for it to settle and forget the old tips
+            self.seen_version = version
+            self.changed_at = now
+            if self.version is not None and self.version != version:
+                self._discard()
+        elif version != self.version and (now - self.changed_at) * 1000 >= self.idle_ms:
+            self.prefetch()
+        self.check_job = self.root.after(self.check_ms, self._check)
+
+    def _discard(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+        self.results.clear()
+        self.version = None
+        # Anyone still waiting falls back to asking for a fresh tip
+        waiters, self.waiters = self.waiters, {}
+        for callbacks in waiters.values():
+            for callback in callbacks:
+                callback(None)
+
+    def prefetch(self):
+        """Request every category for the current budget."""
+        self._discard()
+        self.version = self.budget_manager.version
+        state = self.budget_manager.state_hash()
+        prompts = tip_prompts(self.budget_manager)
+        for category in self.categories:
+            self.tasks[category] = self.runner.submit(
+                self.ai_chat.complete, prompts[category], state=state, priority=PRIORITY_BACKGROUND,
+                on_done=functools.partial(self._store, category),
+                on_error=functools.partial(self._failed, category),
+            )
+
+    def _store(self, category, response):
+        self.tasks.pop(category, None)
+        self.results[category] = response
+        for callback in self.waiters.pop(category, []):
+            callback(response)
+
+    def _failed(self, category, error):
+        print(f"Prefetching {category} tips failed: {error}")
+        self.tasks.pop(category, None)
+        for callback in self.waiters.pop(category, []):
+            callback(None)
+
+    def deliver(self, category, on_ready):
+        """Hand a prefetched tip to on_ready(response) and return True, or return False if there is none.
+
+        A tip that is still being generated is delivered when it arrives. on_ready
+        gets None if that prefetch fails or goes stale, so the caller can ask again.
+        A prefetch that has not started yet is cancelled and False returned, since
+        an interactive request overtakes it.
+        """
+        if self.version is None or self.version != self.budget_manager.version:
+            return False
+        if category in self.results:
+            on_ready(self.results[category])
+            return True
+        task = self.tasks.get(category)
+        if task is not None and task.running:
+            self.waiters.setdefault(category, []).append(on_ready)
+            return True
+        if task is not None:
+            # Still queued behind other prefetches; the caller's own request runs sooner
+            task.cancel()
+            del self.tasks[category]
+        return False
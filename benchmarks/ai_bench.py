@@ -0,0 +1,239 @@
+"""Benchmark the app's AI paths against the fake Ollama server (or a real one).
+
+Measures time-to-first-token and token rate of streamed answers, latency and
+throughput of concurrent requests, response cache hits, the private_agent-style
+prompt pipeline, and event-loop lag in a Tk window while a response streams in.
+
+Usage: python benchmarks/ai_bench.py [--latency 0.2] [--token-rate 50] [--tokens 60]
+                                     [--requests 8] [--concurrency 1 2 4] [--json results.json]
+       python benchmarks/ai_bench.py --host http://127.0.0.1:11434 --model llama3.1   # a real server
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_ollama import FakeOllamaServer
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[int(fraction * (len(values) - 1))] if values else None
+
+
+def ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def bench_streaming(model, requests):
+    """Sequential streamed answers: time-to-first-token, total time and tokens per second."""
+    from ai_chat import AIChat
+
+    chat = AIChat(model)
+    first_token, total, rates = [], [], []
+    for i in range(requests):
+        started = time.perf_counter()
+        first = None
+        chunks = 0
+        for _ in chat.stream_response(f"Benchmark question {i}"):
+            if first is None:
+                first = time.perf_counter() - started
+            chunks += 1
+        elapsed = time.perf_counter() - started
+        first_token.append(first)
+        total.append(elapsed)
+        if elapsed > first:
+            rates.append(chunks / (elapsed - first))
+    return {
+        "requests": requests,
+        "ttft_p50_ms": ms(statistics.median(first_token)),
+        "ttft_p95_ms": ms(percentile(first_token, 0.95)),
+        "total_p50_ms": ms(statistics.median(total)),
+        "tokens_per_s": round(statistics.median(rates), 1) if rates else None,
+    }
+
+
+def bench_concurrency(model, requests, levels):
+    """Blocking requests from several threads at once: latency percentiles and throughput."""
+    from ai_chat import AIChat
+
+    chat = AIChat(model)
+    results = {}
+    for level in levels:
+        latencies = []
+
+        def one(i):
+            started = time.perf_counter()
+            chat.complete(f"Concurrent question {level}-{i}")
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            list(executor.map(one, range(requests)))
+        wall = time.perf_counter() - started
+        results[f"concurrency {level}"] = {
+            "p50_ms": ms(statistics.median(latencies)),
+            "p95_ms": ms(percentile(latencies, 0.95)),
+            "requests_per_s": round(requests / wall, 2),
+        }
+    return results
+
+
+def bench_cache(model):
+    """The same prompt twice through a memory-only response cache."""
+    from ai_chat import AIChat
+    from response_cache import ResponseCache
+
+    chat = AIChat(model, cache=ResponseCache(path=None))
+    timings = []
+    for _ in range(2):
+        started = time.perf_counter()
+        chat.complete("Provide tips for managing a budget.", state="bench")
+        timings.append(time.perf_counter() - started)
+    return {"miss_ms": ms(timings[0]), "hit_ms": ms(timings[1])}
+
+
+def bench_pipeline(model, chain_length=4, max_concurrency=2):
+    """Two independent conversation chains, run through the Pipeline and one step at a time."""
+    from ai_chat import AIChat
+    from prompt_pipeline import Pipeline, Step
+
+    def build_steps():
+        steps = []
+        for chain in ("a", "b"):
+            chat = AIChat(model)
+            for i in range(chain_length):
+                deps = [f"{chain}{i - 1}"] if i else []
+                steps.append(Step(f"{chain}{i}", lambda inputs, chat=chat, i=i: chat.chat(f"Step {i}"), deps=deps))
+        return steps
+
+    started = time.perf_counter()
+    Pipeline(build_steps(), max_concurrency=1).run()
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    Pipeline(build_steps(), max_concurrency=max_concurrency).run()
+    concurrent = time.perf_counter() - started
+    return {"steps": 2 * chain_length, "sequential_ms": ms(sequential), "concurrent_ms": ms(concurrent)}
+
+
+def bench_ui(model):
+    """Stream an answer into a Tk text widget and record event-loop lag and widget updates."""
+    import tkinter as tk
+
+    from ai_chat import AIChat
+    from ai_tasks import AIRunner
+    from instrumentation import EventLoopMonitor
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"skipped": f"no display ({e})"}
+
+    text = tk.Text(root)
+    text.pack()
+    monitor = EventLoopMonitor(root, heartbeat_ms=10)
+    runner = AIRunner(root)
+    chat = AIChat(model)
+    updates = []
+    done = {}
+
+    def on_token(chunk):
+        with monitor.measure("callback", "on_token"):
+            text.insert(tk.END, chunk)
+            text.see(tk.END)
+        updates.append(chunk)
+
+    def on_done(response):
+        done["tokens"] = len(response.split())
+        root.quit()
+
+    monitor.start()
+    task = runner.submit_stream(
+        chat.stream_response, "Stream a long answer", on_token=on_token, on_done=on_done,
+        on_error=lambda error: (done.setdefault("error", str(error)), root.quit()),
+    )
+    root.mainloop()
+    monitor.stop()
+    runner.shutdown()
+    root.destroy()
+
+    summary = monitor.summary()
+    return {
+        "error": done.get("error"),
+        "ttft_ms": ms(task.time_to_first_token),
+        "tokens": done.get("tokens"),
+        "widget_updates": len(updates),
+        "lag_p95_ms": summary["event_loop_lag"]["p95_ms"],
+        "lag_max_ms": summary["event_loop_lag"]["max_ms"],
+    }
+
+
+def print_results(results):
+    for name, values in results.items():
+        print(f"\n{name}")
+        rows = values.items() if not all(isinstance(v, dict) for v in values.values()) else None
+        if rows is None:
+            for label, row in values.items():
+                print(f"  {label:<20}" + ", ".join(f"{key} {value}" for key, value in row.items()))
+        else:
+            for key, value in rows:
+                print(f"  {key:<16}{value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", help="Benchmark this Ollama server instead of starting the fake one")
+    parser.add_argument("--model", default="llama3.1")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake server: seconds to the first token")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Fake server: tokens per second")
+    parser.add_argument("--tokens", type=int, default=60, help="Fake server: tokens per response")
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--skip-ui", action="store_true", help="Skip the Tk event-loop benchmark")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(latency=args.latency, token_rate=args.token_rate, tokens=args.tokens,
+                                  models=(args.model,)).start()
+    # The ollama clients created below read the server address from OLLAMA_HOST
+    os.environ["OLLAMA_HOST"] = args.host or server.url
+
+    try:
+        results = {
+            "streaming": bench_streaming(args.model, args.requests),
+            "concurrency": bench_concurrency(args.model, args.requests, args.concurrency),
+            "cache": bench_cache(args.model),
+            "pipeline": bench_pipeline(args.model),
+        }
+        if not args.skip_ui:
+            results["ui"] = bench_ui(args.model)
+        # Every request above went through the shared client, which counted and timed it
+        from ollama_client import stats
+
+        results["client"] = {
+            operation: {key: row[key] for key in ("requests", "errors", "mean_ms", "p50_ms", "p95_ms")}
+            for operation, row in stats.summary().items()
+        }
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(f"AI benchmarks against {os.environ['OLLAMA_HOST']} ({'fake' if server else 'real'} server)")
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=4)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
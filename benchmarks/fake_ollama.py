@@ -0,0 +1,295 @@
+"""A local stand-in for the Ollama HTTP API, for benchmarks and deterministic runs.
+
+Implements /api/chat and /api/generate (streaming and not), /api/tags, /api/show,
+/api/pull, /api/embed, /api/ps and /api/version with configurable time-to-first-token,
+token rate and failure rate. Point the app at it with OLLAMA_HOST.
+
+Usage: python benchmarks/fake_ollama.py [--port 11435] [--latency 0.2] [--token-rate 50]
+                                        [--tokens 60] [--failure-rate 0]
+       OLLAMA_HOST=http://127.0.0.1:11435 python bugetpy_.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "budget savings income expenses goal plan invest debt interest fund emergency monthly track "
+    "reduce spending rate retire compound diversify automate review cut costs priority"
+).split()
+EMBEDDING_SIZE = 64
+
+
+def default_responder(request, tokens):
+    """Build a deterministic reply of `tokens` words from the last user message."""
+    if request.get("format") == "json":
+        return "{}"
+    messages = request.get("messages") or [{"content": request.get("prompt", "")}]
+    seed = int(hashlib.sha256(messages[-1]["content"].encode()).hexdigest(), 16)
+    return " ".join(WORDS[(seed >> i) % len(WORDS)] for i in range(tokens)) + "."
+
+
+def fake_embedding(text, size=EMBEDDING_SIZE):
+    """A deterministic unit vector for a text; equal texts get equal vectors."""
+    rng = random.Random(hashlib.sha256(text.encode()).digest())
+    vector = [rng.gauss(0, 1) for _ in range(size)]
+    norm = sum(value * value for value in vector) ** 0.5
+    return [value / norm for value in vector]
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeOllamaServer:
+    """Serves the fake API on a background thread.
+
+    latency is the time to the first token in seconds, token_rate the tokens
+    per second after that, and failure_rate the share of generation requests
+    answered with HTTP 500. responder(request, tokens) -> str can replace the
+    generated text, e.g. to return JSON for format="json" requests.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, token_rate=50.0, tokens=60, failure_rate=0.0,
+                 models=("llama3.1",), responder=default_responder, seed=0):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.tokens = tokens
+        self.failure_rate = failure_rate
+        self.models = set(models)
+        self.loaded = set()
+        self.responder = responder
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = {}  # Path -> count
+        self.active = 0
+        self.peak_active = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-ollama", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.failure_rate
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, so pooled clients reuse connections
+            disable_nagle_algorithm = True  # Send every streamed token right away
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, data, status=200):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_chunk(self, data):
+                line = json.dumps(data).encode() + b"\n"
+                self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+
+            def read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                self.count()
+                if self.path == "/api/tags":
+                    self.send_json({"models": [fake.model_info(name) for name in sorted(fake.models)]})
+                elif self.path == "/api/ps":
+                    self.send_json({"models": [fake.model_info(name) for name in sorted(fake.loaded)]})
+                elif self.path == "/api/version":
+                    self.send_json({"version": "0.0.0-fake"})
+                else:
+                    self.send_json({"error": "not found"}, 404)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                self.count()
+                request = self.read_json()
+                handlers = {
+                    "/api/chat": self.generate,
+                    "/api/generate": self.generate,
+                    "/api/embed": self.embed,
+                    "/api/show": self.show,
+                    "/api/pull": self.pull,
+                }
+                handler = handlers.get(self.path)
+                if handler is None:
+                    self.send_json({"error": "not found"}, 404)
+                else:
+                    handler(request)
+
+            def count(self):
+                with fake.lock:
+                    fake.requests[self.path] = fake.requests.get(self.path, 0) + 1
+
+            def check_model(self, request):
+                if request.get("model") not in fake.models:
+                    self.send_json({"error": f"model '{request.get('model')}' not found"}, 404)
+                    return False
+                return True
+
+            def generate(self, request):
+                if not self.check_model(request):
+                    return
+                if fake.should_fail():
+                    self.send_json({"error": "simulated failure"}, 500)
+                    return
+
+                chat = self.path == "/api/chat"
+                field = "message" if chat else "response"
+                # A request without messages/prompt just loads the model, like Ollama's warm-up call
+                if not request.get("messages") and not request.get("prompt"):
+                    fake.loaded.add(request["model"])
+                    body = {"model": request["model"], "created_at": now_iso(), "done": True, "done_reason": "load"}
+                    body[field] = {"role": "assistant", "content": ""} if chat else ""
+                    self.send_json(body)
+                    return
+
+                with fake.lock:
+                    fake.active += 1
+                    fake.peak_active = max(fake.peak_active, fake.active)
+                try:
+                    self.respond(request, chat, field)
+                finally:
+                    with fake.lock:
+                        fake.active -= 1
+
+            def respond(self, request, chat, field):
+                started = time.perf_counter()
+                tokens = int((request.get("options") or {}).get("num_predict") or fake.tokens)
+                words = fake.responder(request, tokens).split(" ")
+                pieces = [word + " " for word in words[:-1]] + words[-1:]
+                time.sleep(fake.latency)
+                fake.loaded.add(request["model"])
+
+                def part(text):
+                    return {"role": "assistant", "content": text} if chat else text
+
+                final = {
+                    "model": request["model"], "created_at": now_iso(), "done": True, "done_reason": "stop",
+                    "prompt_eval_count": sum(len(m.get("content", "")) // 4 for m in request.get("messages", [])),
+                    "eval_count": len(pieces),
+                }
+                if request.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for i, piece in enumerate(pieces):
+                        if i and fake.token_rate:
+                            time.sleep(1 / fake.token_rate)
+                        self.send_chunk({"model": request["model"], "created_at": now_iso(), field: part(piece), "done": False})
+                    final[field] = part("")
+                    final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+                    self.send_chunk(final)
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    if fake.token_rate:
+                        time.sleep((len(pieces) - 1) / fake.token_rate)
+                    final[field] = part("".join(pieces))
+                    final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+                    self.send_json(final)
+
+            def embed(self, request):
+                if not self.check_model(request):
+                    return
+                inputs = request.get("input", "")
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                time.sleep(fake.latency / 10)
+                self.send_json({"model": request["model"], "embeddings": [fake_embedding(text) for text in inputs]})
+
+            def show(self, request):
+                if not self.check_model(request):
+                    return
+                self.send_json({"modelfile": "", "parameters": "", "template": "", "details": {"family": "fake"}})
+
+            def pull(self, request):
+                model = request.get("model")
+                statuses = [{"status": "pulling manifest"}, {"status": "verifying sha256 digest"}, {"status": "success"}]
+                with fake.lock:
+                    fake.models.add(model)
+                if not request.get("stream", True):
+                    self.send_json(statuses[-1])
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for status in statuses:
+                    time.sleep(fake.latency / 10)
+                    self.send_chunk(status)
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+    def model_info(self, name):
+        return {
+            "name": name, "model": name, "modified_at": now_iso(), "size": 0,
+            "digest": hashlib.sha256(name.encode()).hexdigest(),
+            "details": {"format": "gguf", "family": "fake", "parameter_size": "0B", "quantization_level": "none"},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds to the first token")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Tokens per second while streaming")
+    parser.add_argument("--tokens", type=int, default=60, help="Tokens per response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument("--model", action="append", dest="models", help="Models to report as installed")
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        args.host, args.port, args.latency, args.token_rate, args.tokens, args.failure_rate,
+        models=args.models or ("llama3.1",),
+    )
+    print(f"Fake Ollama listening on {server.url}; set OLLAMA_HOST={server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Check that importing the core budget module stays cheap.
+
+Runs fresh interpreters with `-X importtime` and fails when the module's cumulative
+import time goes over the budget, or when a GUI, plotting, pandas or LLM package is
+pulled in along with it.
+
+Usage: python benchmarks/import_time.py [--module budget_core] [--budget-ms 20] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("tkinter", "customtkinter", "matplotlib", "numpy", "pandas", "ollama", "httpx")
+
+
+def import_times(module):
+    """Import a module in a fresh interpreter and return {module name: cumulative microseconds}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="budget_core")
+    parser.add_argument("--budget-ms", type=float, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    median_ms = statistics.median(times[args.module] for times in runs) / 1000
+    heavy = sorted({name.split(".")[0] for name in runs[0]} & set(HEAVY_MODULES))
+
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    if heavy:
+        print(f"heavy modules imported: {', '.join(heavy)}")
+    return 0 if median_ms <= args.budget_ms and not heavy else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
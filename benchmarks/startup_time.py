@@ -0,0 +1,47 @@
+"""Measure the budget GUI's time-to-first-frame and fail when it goes over the target.
+
+Usage: python benchmarks/startup_time.py [--runs 5] [--target-ms 500]
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bugetpy_ import FIRST_FRAME_TARGET_MS, BudgetManager, BudgetManagerGUI
+
+
+def measure_first_frame():
+    """Open the window once and return its time-to-first-frame in milliseconds."""
+    # Without the model warm-up, which would start talking to Ollama while the window is measured
+    app = BudgetManagerGUI(BudgetManager(age=29, annual_income=82000), warm_up_model=False)
+
+    def close_when_painted():
+        if app.first_frame_ms is None:
+            app.after(10, close_when_painted)
+        else:
+            app.quit()
+
+    app.after(10, close_when_painted)
+    app.mainloop()
+    first_frame_ms = app.first_frame_ms
+    app.destroy()
+    return first_frame_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=FIRST_FRAME_TARGET_MS)
+    args = parser.parse_args()
+
+    timings = [measure_first_frame() for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"time-to-first-frame: median {median:.0f} ms, min {min(timings):.0f} ms, max {max(timings):.0f} ms "
+          f"over {args.runs} runs (target {args.target_ms:.0f} ms)")
+    return 0 if median <= args.target_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Headless batch runner for budget profiles.
+
+Loads one or more profiles saved with BudgetManager.save_data(), computes savings,
+goal progress, retirement and debt projections, and writes the reports as JSON,
+CSV or PNG charts. No Tk root is created, so it can run on servers and in cron.
+
+Example:
+    python budget_cli.py profiles/*.json --format json csv png --output-dir reports --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from budget_core import BudgetManager
+
+FORMATS = ("json", "csv", "png")
+CSV_FIELDS = [
+    "profile", "age", "annual_income", "total_income", "total_expenses", "monthly_savings",
+    "retirement_age", "retirement_estimate", "goals_completed", "goals_total", "debt_free_months",
+]
+
+
+def profile_names(paths):
+    """Return the output name of every profile, in order.
+
+    A name is the file name without extension. Different files that share it
+    get as many parent directories as it takes to tell them apart, e.g.
+    "alice_budget" and "bob_budget" for alice/budget.json and bob/budget.json.
+    """
+    files = list(dict.fromkeys(os.path.abspath(os.path.splitext(path)[0]) for path in paths))
+    parts = [file.strip(os.sep).split(os.sep) for file in files]
+    depths = [1] * len(files)
+    while True:
+        names = ["_".join(part[-depth:]) for part, depth in zip(parts, depths)]
+        counts = {}
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+        deeper = [i for i, name in enumerate(names) if counts[name] > 1 and depths[i] < len(parts[i])]
+        if not deeper:
+            break
+        for i in deeper:
+            depths[i] += 1
+    # Names can still clash when a directory name contains "_", e.g. a/b.json and a_b.json
+    seen = set()
+    for i, name in enumerate(names):
+        while names[i] in seen:
+            names[i] = f"{names[i]}-{i + 1}"
+        seen.add(names[i])
+    by_file = dict(zip(files, names))
+    return [by_file[os.path.abspath(os.path.splitext(path)[0])] for path in paths]
+
+
+def build_report(budget_manager, retirement_age=65):
+    """Compute the figures reported for one profile."""
+    goals = {}
+    for name, goal in budget_manager.financial_goals.items():
+        target = goal["target_amount"]
+        goals[name] = {
+            "target_amount": target,
+            "current_amount": goal["current_amount"],
+            "progress_pct": round(goal["current_amount"] / target * 100, 1) if target else None,
+        }
+
+    retirement = budget_manager.estimate_retirement_amount(retirement_age)
+    debts = budget_manager.project_debt_payoff()
+    payoff_months = [projection["months"] for projection in debts.values()]
+
+    return {
+        "age": budget_manager.age,
+        "annual_income": budget_manager.annual_income,
+        "total_income": sum(budget_manager.incomes.values()),
+        "total_expenses": sum(sum(exp.values()) for exp in budget_manager.expenses.values()),
+        "monthly_savings": round(budget_manager.calculate_monthly_savings(), 2),
+        "goals": goals,
+        "retirement": {
+            "age": retirement_age,
+            # estimate_retirement_amount() returns a message when the age has already passed
+            "estimated_amount": round(retirement, 2) if isinstance(retirement, (int, float)) else None,
+        },
+        "debts": debts,
+        "debt_free_months": None if None in payoff_months else max(payoff_months, default=0),
+    }
+
+
+def process_profile(path, formats, output_dir, retirement_age=65, charts=("Pie", "Bar", "Line"), name=None):
+    """Load a profile, build its report and write any per-profile outputs. Runs in a worker.
+
+    A chart that fails to render is listed under "chart_errors" instead of
+    failing the whole profile.
+    """
+    budget_manager = BudgetManager()
+    budget_manager.load_data(path, quiet=True)  # One line per profile from every worker would drown the summary
+    report = build_report(budget_manager, retirement_age)
+    report["profile"] = name or profile_names([path])[0]
+
+    if "png" in formats:
+        # Imported here so JSON/CSV-only runs never load matplotlib
+        from chart_renderer import chart_data, render_chart
+
+        data = chart_data(budget_manager)
+        report["charts"] = []
+        for chart_type in charts:
+            filename = os.path.join(output_dir, f"{report['profile']}_{chart_type.lower()}.png")
+            try:
+                image = render_chart(chart_type, data)
+            except Exception as e:
+                report.setdefault("chart_errors", {})[chart_type] = str(e)
+                continue
+            with open(filename, "wb") as file:
+                file.write(image)
+            report["charts"].append(filename)
+
+    return report
+
+
+def csv_row(report):
+    return {
+        "profile": report["profile"],
+        "age": report["age"],
+        "annual_income": report["annual_income"],
+        "total_income": report["total_income"],
+        "total_expenses": report["total_expenses"],
+        "monthly_savings": report["monthly_savings"],
+        "retirement_age": report["retirement"]["age"],
+        "retirement_estimate": report["retirement"]["estimated_amount"],
+        "goals_completed": sum(1 for goal in report["goals"].values() if (goal["progress_pct"] or 0) >= 100),
+        "goals_total": len(report["goals"]),
+        "debt_free_months": report["debt_free_months"],
+    }
+
+
+def write_reports(reports, formats, output_dir):
+    """Write the combined JSON and CSV reports for all profiles."""
+    written = []
+    if "json" in formats:
+        filename = os.path.join(output_dir, "budget_report.json")
+        with open(filename, "w") as file:
+            json.dump(reports, file, indent=4)
+        written.append(filename)
+    if "csv" in formats:
+        filename = os.path.join(output_dir, "budget_report.csv")
+        with open(filename, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(csv_row(report) for report in reports)
+        written.append(filename)
+    return written
+
+
+def run(paths, formats, output_dir, workers=1, retirement_age=65):
+    """Process every profile, in parallel when workers > 1, and return the reports in input order."""
+    os.makedirs(output_dir, exist_ok=True)
+    reports = {}
+    errors = {}
+
+    names = dict(zip(paths, profile_names(paths)))
+
+    if workers <= 1:
+        for path in paths:
+            try:
+                reports[path] = process_profile(path, formats, output_dir, retirement_age, name=names[path])
+            except Exception as e:
+                errors[path] = e
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(process_profile, path, formats, output_dir, retirement_age, name=names[path]): path
+                for path in paths
+            }
+            for future in as_completed(futures):
+                try:
+                    reports[futures[future]] = future.result()
+                except Exception as e:
+                    errors[futures[future]] = e
+
+    for path, error in errors.items():
+        print(f"Failed to process {path}: {error}", file=sys.stderr)
+    for path, report in reports.items():
+        for chart_type, error in report.get("chart_errors", {}).items():
+            print(f"Failed to render the {chart_type} chart of {path}: {error}", file=sys.stderr)
+    return [reports[path] for path in paths if path in reports], errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute budget reports for saved profiles without a GUI.")
+    parser.add_argument("profiles", nargs="+", help="Profile JSON files written by BudgetManager.save_data()")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["json"], dest="formats")
+    parser.add_argument("--output-dir", default="reports")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--retirement-age", type=int, default=65)
+    args = parser.parse_args(argv)
+
+    missing = [path for path in args.profiles if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"profile not found: {', '.join(missing)}")
+
+    reports, errors = run(args.profiles, args.formats, args.output_dir, args.workers, args.retirement_age)
+    for filename in write_reports(reports, args.formats, args.output_dir):
+        print(f"Report written to {filename}")
+    return 1 if errors or any("chart_errors" in report for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
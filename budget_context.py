@@ -0,0 +1,98 @@
+"""Compact budget summaries for LLM prompts.
+
+build_budget_context() turns a BudgetManager into a few short lines (totals,
+ratios, the largest expense categories, debts, investments and goals) instead
+of the full profile, so prompt evaluation on a local model stays fast however
+large the ledger grows. The output is deterministic for equal budgets, which
+keeps the response cache and the server's prompt cache effective.
+"""
+from conversation import CHARS_PER_TOKEN, estimate_tokens
+
+DEFAULT_CONTEXT_TOKENS = 250  # Hard cap on the context added to a prompt
+TOP_EXPENSE_CATEGORIES = 5
+MAX_GOALS = 5
+
+
+def money(amount):
+    return f"${amount:,.0f}"
+
+
+def percent(part, whole):
+    return f"{part / whole * 100:.0f}%" if whole else "n/a"
+
+
+def context_lines(budget_manager, retirement_age=65, top_n=TOP_EXPENSE_CATEGORIES):
+    """Return the summary lines, most important first."""
+    monthly_income = budget_manager.monthly_income or sum(budget_manager.incomes.values())
+    category_totals = {
+        category: sum(expenses.values()) for category, expenses in budget_manager.expenses.items()
+    }
+    total_expenses = sum(category_totals.values())
+    total_bills = sum(budget_manager.bills.values())
+    debt_payments = sum(debt["monthly_payment"] for debt in budget_manager.debts.values())
+    savings = monthly_income - (total_expenses + total_bills + debt_payments)
+
+    lines = [
+        f"Age {budget_manager.age}; income {money(monthly_income)}/mo; expenses {money(total_expenses)}/mo; "
+        f"bills {money(total_bills)}/mo; debt payments {money(debt_payments)}/mo; "
+        f"savings {money(savings)}/mo ({percent(savings, monthly_income)} of income)"
+    ]
+    if category_totals:
+        # Largest first, ties by name, so the text is the same for the same budget
+        ranked = sorted(category_totals.items(), key=lambda item: (-item[1], item[0]))
+        parts = [f"{name} {money(amount)} ({percent(amount, total_expenses)})" for name, amount in ranked[:top_n]]
+        rest = ranked[top_n:]
+        if rest:
+            rest_total = sum(amount for _, amount in rest)
+            parts.append(f"{len(rest)} other categories {money(rest_total)} ({percent(rest_total, total_expenses)})")
+        lines.append("Top expenses: " + ", ".join(parts))
+
+    if budget_manager.debts:
+        total_debt = sum(debt["amount"] for debt in budget_manager.debts.values())
+        highest_rate = max(debt["interest_rate"] for debt in budget_manager.debts.values())
+        payoff = [projection["months"] for projection in budget_manager.project_debt_payoff().values()]
+        horizon = "never at current payments" if None in payoff else f"in {max(payoff)} months"
+        lines.append(
+            f"Debt: {money(total_debt)} across {len(budget_manager.debts)} debts, highest rate {highest_rate}%, "
+            f"debt-free {horizon}; debt is {percent(total_debt, monthly_income * 12)} of annual income"
+        )
+
+    if budget_manager.investments:
+        invested = sum(investment["amount"] for investment in budget_manager.investments.values())
+        line = f"Investments: {money(invested)}"
+        estimate = budget_manager.estimate_retirement_amount(retirement_age)
+        if isinstance(estimate, (int, float)):
+            line += f"; projected {money(estimate)} at age {retirement_age}"
+        lines.append(line)
+
+    if budget_manager.financial_goals:
+        goals = sorted(budget_manager.financial_goals.items())
+        parts = [
+            f"{name} {percent(goal['current_amount'], goal['target_amount'])} of {money(goal['target_amount'])}"
+            for name, goal in goals[:MAX_GOALS]
+        ]
+        if len(goals) > MAX_GOALS:
+            parts.append(f"{len(goals) - MAX_GOALS} more")
+        lines.append("Goals: " + ", ".join(parts))
+
+    if budget_manager.incomes:
+        sources = sorted(budget_manager.incomes.items(), key=lambda item: (-item[1], item[0]))
+        lines.append("Income sources: " + ", ".join(f"{name} {money(amount)}" for name, amount in sources[:top_n]))
+
+    return lines
+
+
+def build_budget_context(budget_manager, max_tokens=DEFAULT_CONTEXT_TOKENS, retirement_age=65,
+                         top_n=TOP_EXPENSE_CATEGORIES):
+    """Return the budget summary as text of at most max_tokens (estimated).
+
+    Lines are dropped from the least important end until the text fits. If the
+    first line alone is too long it is cut off at the cap.
+    """
+    lines = context_lines(budget_manager, retirement_age, top_n)
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop()
+    text = "\n".join(lines)
+    if estimate_tokens(text) > max_tokens:
+        text = text[:max(max_tokens - 1, 0) * CHARS_PER_TOKEN]
+    return text
@@ -0,0 +1,156 @@
+# Budget data model and calculations.
+# Keep this module free of GUI, plotting, pandas and LLM imports so it stays cheap to import.
+# The GUI modules and budget_cli.py all build on it.
+import hashlib
+import json
+
+
+class BudgetManager:
+    def __init__(self, age=0, annual_income=0):
+        self.age = age
+        self.annual_income = annual_income
+        self.monthly_income = annual_income / 12
+        self.expenses = {}  # Now stores expenses grouped by category
+        self.bills = {}
+        self.investments = {}
+        self.debts = {}
+        self.financial_goals = {}
+        self.savings = 0
+        self.incomes = {}  # Dictionary to hold income sources
+        self.version = 0  # Bumped on every change so views can tell when cached output is stale
+
+    def mark_changed(self):
+        """Record that the budget data has changed."""
+        self.version += 1
+
+    def add_income(self, name, amount):
+        """Add an income source to the budget."""
+        self.incomes[name] = amount
+        self.mark_changed()
+
+    def add_expense(self, name, amount, category):
+        """Add an expense to the budget under a specific category."""
+        if category not in self.expenses:
+            self.expenses[category] = {}
+        self.expenses[category][name] = amount
+        self.mark_changed()
+
+    def add_bill(self, name, amount):
+        self.bills[name] = amount
+        self.mark_changed()
+
+    def add_investment(self, name, amount, annual_return_rate):
+        self.investments[name] = {"amount": amount, "rate": annual_return_rate}
+        self.mark_changed()
+
+    def add_debt(self, name, amount, interest_rate, monthly_payment):
+        self.debts[name] = {
+            "amount": amount,
+            "interest_rate": interest_rate,
+            "monthly_payment": monthly_payment,
+        }
+        self.mark_changed()
+
+    def add_goal(self, name, target_amount):
+        """Add a financial goal with a target amount."""
+        self.financial_goals[name] = {"target_amount": target_amount, "current_amount": 0}
+        self.mark_changed()
+
+    def contribute_to_goal(self, name, amount):
+        """Contribute a specified amount to a financial goal."""
+        if name in self.financial_goals:
+            self.financial_goals[name]["current_amount"] += amount
+            self.mark_changed()
+        else:
+            print(f"Goal '{name}' not found.")
+
+    def calculate_monthly_savings(self):
+        """Calculates and returns the monthly savings."""
+        total_expenses = sum(sum(exp.values()) for exp in self.expenses.values())
+        total_bills = sum(self.bills.values())
+        total_debt_payments = sum(debt["monthly_payment"] for debt in self.debts.values())
+        self.savings = self.monthly_income - (total_expenses + total_bills + total_debt_payments)
+        return self.savings
+
+    def estimate_retirement_amount(self, desired_retirement_age):
+        years_until_retirement = desired_retirement_age - self.age
+        if years_until_retirement <= 0:
+            return "You are already at or past your desired retirement age."
+
+        current_savings = sum(inv["amount"] for inv in self.investments.values())
+        estimated_growth = current_savings
+
+        for _ in range(years_until_retirement):
+            estimated_growth += estimated_growth * 0.05  # Assuming 5% annual growth
+
+        return estimated_growth
+
+    def project_debt_payoff(self, max_months=600):
+        """Project how long each debt takes to pay off at its current monthly payment.
+
+        Interest rates are annual percentages. A debt whose payment does not cover
+        the monthly interest never gets paid off and is reported with months=None.
+        """
+        projections = {}
+        for name, debt in self.debts.items():
+            balance = debt["amount"]
+            monthly_rate = debt["interest_rate"] / 100 / 12
+            total_interest = 0
+            months = 0
+            while balance > 0 and months < max_months:
+                interest = balance * monthly_rate
+                if debt["monthly_payment"] <= interest:
+                    break
+                total_interest += interest
+                balance = balance + interest - debt["monthly_payment"]
+                months += 1
+            paid_off = balance <= 0
+            projections[name] = {
+                "months": months if paid_off else None,
+                "total_interest": round(total_interest, 2) if paid_off else None,
+            }
+        return projections
+
+    def to_dict(self):
+        """Return the budget data in the layout written by save_data()."""
+        return {
+            "age": self.age,
+            "annual_income": self.annual_income,
+            "expenses": self.expenses,
+            "bills": self.bills,
+            "investments": self.investments,
+            "debits": self.debts,
+            "financial_goals": self.financial_goals,
+            "incomes": self.incomes,
+        }
+
+    def state_hash(self):
+        """Return a short hash of the budget data; equal budgets give equal hashes."""
+        encoded = json.dumps(self.to_dict(), sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    def save_data(self, filename="budget_data.json"):
+        with open(filename, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+        print(f"Data saved to {filename}")
+
+    def load_data(self, filename="budget_data.json", quiet=False):
+        """Load a saved budget; `quiet` leaves out the success message, e.g. in batch workers."""
+        try:
+            with open(filename, "r") as file:
+                data = json.load(file)
+                self.age = data["age"]
+                self.annual_income = data["annual_income"]
+                self.monthly_income = self.annual_income / 12
+                self.expenses = data["expenses"]
+                self.bills = data["bills"]
+                self.investments = data["investments"]
+                self.debts = data["debits"]
+                self.financial_goals = data["financial_goals"]
+                self.incomes = data["incomes"]
+            self.mark_changed()
+            if not quiet:
+                print(f"Data loaded from {filename}")
+        except FileNotFoundError:
+            print(f"No data file found with the name {filename}")
+
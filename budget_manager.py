@@ -5,37 +5,31 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import tkinter as tk
 import customtkinter as ctk
 from matplotlib.backend_bases import MouseEvent
-import pandas as pd
 import json
-import numpy as np
-import ollama  # Assuming ollama is used in AIChat as per main_gui.py
-
-ctk.ThemeManager.load_theme("blue")
-ctk.AppearanceModeTracker.set_appearance_mode("Dark")
-
-
-# AIChat Class for interacting with the AI model
-class AIChat:
-    def __init__(self, model_name):
-        self.model_name = model_name
-
-    def generate_response(self, prompt):
-        """Generate a response from the AI model using a prompt."""
-        try:
-            response = ollama.chat(model=self.model_name, messages=[{"role": "user", "content": prompt}])
-            return response["message"]["content"]
-        except Exception as e:
-            return f"An error occurred while generating the response: {e}"
+from ai_chat import AIChat
+from ai_tasks import DEFAULT_TIMEOUT, AIRunner
+from budget_context import build_budget_context
+from ai_tips import tip_prompts
+from response_cache import ResponseCache
+from budget_core import BudgetManager
+from chart_renderer import ChartRenderService, chart_data, draw_chart
 
 
 class BudgetManagerGUI(ctk.CTk):
     def __init__(self, budget_manager):
+        # Theme is applied when a window is created rather than when the module is imported
+        ctk.ThemeManager.load_theme("blue")
+        ctk.AppearanceModeTracker.set_appearance_mode("Dark")
         super().__init__()
         self.budget_manager = budget_manager
-        self.ai_chat = AIChat("llama3.1")  # Instantiate AIChat with the model
+        self.ai_chat = AIChat("llama3.1", timeout=DEFAULT_TIMEOUT, cache=ResponseCache())  # Instantiate AIChat with the model
+        self.ai_runner = AIRunner(self)  # Runs model calls off the Tk thread
+        self.ai_task = None
+        self.ai_streamed_text = ""  # Response received so far while streaming
         self.title("Enhanced Budget Manager with AI Assistance")
         self.geometry("1200x900")
         self.current_chart = "Pie"  # Track which chart is currently displayed
+        self.render_service = ChartRenderService(max_workers=1)
         self.create_widgets()
        
 
@@ -178,33 +172,12 @@ class BudgetManagerGUI(ctk.CTk):
         """Update graphs based on the current data and chart type."""
         self.ax.clear()  # Clear existing graphs
 
-        # Gather data
-        categories = list(self.budget_manager.expenses.keys())
-        values = [sum(self.budget_manager.expenses[cat].values()) for cat in categories]
-        total_income = sum(self.budget_manager.incomes.values())
-
-        # Draw the selected chart type
+        data = chart_data(self.budget_manager)
+        self.categories = data["categories"]
+        self.values = data["values"]
+        artists = draw_chart(self.ax, self.current_chart, data)
         if self.current_chart == "Pie":
-            self.pie_wedges, _, _ = self.ax.pie(values, labels=categories, autopct='%1.1f%%')
-            self.ax.set_title('Expense Breakdown by Category')
-        elif self.current_chart == "Line":
-            months = np.arange(1, 13)
-            savings = np.cumsum([self.budget_manager.calculate_monthly_savings() for _ in months])
-            self.ax.plot(months, savings, marker='o')
-            self.ax.set_title('Savings Over Time')
-            self.ax.set_xlabel('Month')
-            self.ax.set_ylabel('Savings ($)')
-        elif self.current_chart == "Bar":
-            self.ax.bar(categories, values, color=['#4CAF50', '#FFC107', '#2196F3', '#FF5722'])
-            self.ax.set_title('Expenses by Category')
-            self.ax.set_xlabel('Category')
-            self.ax.set_ylabel('Amount ($)')
-        elif self.current_chart == "Scatter":
-            income_values = [total_income] * len(values)
-            self.ax.scatter(income_values, values)
-            self.ax.set_title('Income vs. Expenses')
-            self.ax.set_xlabel('Income ($)')
-            self.ax.set_ylabel('Expenses ($)')
+            self.pie_wedges = artists
 
         self.canvas.draw()
 
@@ -216,6 +189,9 @@ class BudgetManagerGUI(ctk.CTk):
         self.ask_ai_button = ctk.CTkButton(self, text="Ask AI", command=self.ask_ai)
         self.ask_ai_button.grid(row=2, column=4, padx=10, pady=10)
 
+        self.cancel_ai_button = ctk.CTkButton(self, text="Cancel", command=self.cancel_ai_request, state="disabled")
+        self.cancel_ai_button.grid(row=2, column=5, padx=10, pady=10)
+
         self.ai_response_label = ctk.CTkLabel(self, text="", wraplength=800)
         self.ai_response_label.grid(row=3, column=4, columnspan=4, pady=10)
 
@@ -232,41 +208,68 @@ class BudgetManagerGUI(ctk.CTk):
     def ask_ai(self):
         """Send the user's question to the AI model and display the response."""
         question = self.ai_input_entry.get()
-        response = self.ai_chat.generate_response(question)
-        self.ai_response_label.configure(text=response)
+        self.request_ai(question, follow_up=True)
+
+    def request_ai(self, prompt, follow_up=False):
+        """Stream the prompt's response into the label, showing "Thinking..." until the first token."""
+        self.cancel_ai_button.configure(state="normal")
+        self.ai_streamed_text = ""
+        if follow_up:
+            # Questions continue one conversation; tips are one-shot and cached per budget state
+            # The budget summary goes in the system prompt, which only changes along with the budget
+            self.ai_chat.conversation.system_prompt = (
+                f"You are a personal finance advisor. The user's budget:\n{build_budget_context(self.budget_manager)}"
+            )
+            stream, kwargs = self.ai_chat.stream_chat, {}
+        else:
+            stream, kwargs = self.ai_chat.stream_response, {"state": self.budget_manager.state_hash()}
+        self.ai_task = self.ai_runner.submit_stream(
+            stream, prompt, **kwargs,
+            on_token=self.append_ai_response,
+            on_done=self.show_ai_response,
+            on_error=lambda error: self.show_ai_response(f"Request failed: {error}"),
+            on_status=self.show_ai_pending,
+            key="answer",  # Replaces the request still waiting for an answer
+        )
+
+    def show_ai_pending(self, task):
+        if task.first_token_at is None:
+            self.ai_response_label.configure(text=f"Thinking... {task.elapsed:.0f}s")
+
+    def append_ai_response(self, text):
+        self.ai_streamed_text += text
+        self.ai_response_label.configure(text=self.ai_streamed_text)
+
+    def show_ai_response(self, text):
+        self.ai_task = None
+        self.cancel_ai_button.configure(state="disabled")
+        self.ai_response_label.configure(text=text)
+
+    def cancel_ai_request(self):
+        """Stop waiting for the current AI response."""
+        if self.ai_task is not None:
+            self.ai_task.cancel()
+            self.show_ai_response("Request cancelled.")
 
     def get_budget_tips(self):
         """Generate AI tips for budgeting based on current financial data."""
-        prompt = (
-            f"My current monthly income is ${sum(self.budget_manager.incomes.values()):.2f} "
-            f"and my total expenses are ${sum(sum(exp.values()) for exp in self.budget_manager.expenses.values()):.2f}. "
-            "Can you suggest some tips for better budgeting?"
-        )
-        response = self.ai_chat.generate_response(prompt)
-        self.ai_response_label.configure(text=response)
+        prompt = tip_prompts(self.budget_manager)["budget"]
+        self.request_ai(prompt)
 
     def get_savings_tips(self):
         """Generate AI tips for savings based on current financial data."""
-        prompt = (
-            f"I save approximately ${self.budget_manager.calculate_monthly_savings():.2f} monthly. "
-            "Can you suggest ways to increase my savings rate?"
-        )
-        response = self.ai_chat.generate_response(prompt)
-        self.ai_response_label.configure(text=response)
+        prompt = tip_prompts(self.budget_manager)["savings"]
+        self.request_ai(prompt)
 
     def get_investment_tips(self):
         """Generate AI tips for investments based on current financial data."""
-        prompt = (
-            "Based on my current income and expenses, can you suggest some low-risk investment strategies "
-            "to grow my savings over time?"
-        )
-        response = self.ai_chat.generate_response(prompt)
-        self.ai_response_label.configure(text=response)
+        prompt = tip_prompts(self.budget_manager)["investment"]
+        self.request_ai(prompt)
 
     def on_hover(self, event):
         """Show tooltips when hovering over the chart elements."""
         if self.current_chart == "Pie" and event.inaxes == self.ax:
-            for wedge, category, value in zip(self.pie_wedges, categories, values):
+            for wedge, category, value in zip(self.pie_wedges, self.categories, self.values):
                 if wedge.contains(event)[0]:
                     self.display_tooltip(event, f"{category}: ${value:.2f}")
                     return
@@ -301,10 +304,30 @@ class BudgetManagerGUI(ctk.CTk):
         }
         with open("graph_data.json", "w") as file:
             json.dump(data, file, indent=4)
-        self.output_label.configure(text="Graph data saved as 'graph_data.json'.")
-        self.fig.savefig("graphs.png")
-        self.output_label.configure(text="Graphs saved as 'graphs.png'.")
-        print("Graph data and images saved successfully.")
+        self.output_label.configure(text="Graph data saved as 'graph_data.json'. Rendering graphs...")
+
+        # Render off the main thread and write the image once the worker is done
+        future = self.render_service.submit(self.current_chart, chart_data(self.budget_manager))
+        self.after(100, self.poll_graph_render, future, "graphs.png")
+
+    def poll_graph_render(self, future, filename):
+        """Write a background chart render to disk once it has finished."""
+        if not future.done():
+            self.after(100, self.poll_graph_render, future, filename)
+            return
+        try:
+            with open(filename, "wb") as file:
+                file.write(future.result())
+            self.output_label.configure(text=f"Graphs saved as '{filename}'.")
+            print("Graph data and images saved successfully.")
+        except Exception as e:
+            self.output_label.configure(text=f"Error saving graphs: {e}")
+
+    def destroy(self):
+        """Stop the chart render workers and AI requests along with the window."""
+        self.ai_runner.shutdown()
+        self.render_service.shutdown(wait=False)
+        super().destroy()
 
     def on_click(self, event: MouseEvent):
         if event.inaxes in [self.ax]:
@@ -317,103 +340,6 @@ class BudgetManagerGUI(ctk.CTk):
             print("Clicked on Income section.")
 
 
-class BudgetManager:
-    def __init__(self, age=0, annual_income=0):
-        self.age = age
-        self.annual_income = annual_income
-        self.monthly_income = annual_income / 12
-        self.expenses = {}  # Now stores expenses grouped by category
-        self.bills = {}
-        self.investments = {}
-        self.debts = {}
-        self.financial_goals = {}
-        self.savings = 0
-        self.incomes = {}  # Dictionary to hold income sources
-
-    def add_income(self, name, amount):
-        """Add an income source to the budget."""
-        self.incomes[name] = amount
-
-    def add_expense(self, name, amount, category):
-        """Add an expense to the budget under a specific category."""
-        if category not in self.expenses:
-            self.expenses[category] = {}
-        self.expenses[category][name] = amount
-
-    def add_bill(self, name, amount):
-        self.bills[name] = amount
-
-    def add_investment(self, name, amount, annual_return_rate):
-        self.investments[name] = {"amount": amount, "rate": annual_return_rate}
-
-    def add_debt(self, name, amount, interest_rate, monthly_payment):
-        self.debts[name] = {
-            "amount": amount,
-            "interest_rate": interest_rate,
-            "monthly_payment": monthly_payment,
-        }
-
-    def add_goal(self, name, target_amount):
-        self.financial_goals[name] = {"target_amount": target_amount, "current_amount": 0}
-
-    def contribute_to_goal(self, name, amount):
-        if name in self.financial_goals:
-            self.financial_goals[name]["current_amount"] += amount
-        else:
-            print(f"Goal '{name}' not found.")
-
-    def calculate_monthly_savings(self):
-        total_expenses = sum(sum(exp.values()) for exp in self.expenses.values())
-        total_bills = sum(self.bills.values())
-        total_debt_payments = sum(debt["monthly_payment"] for debt in self.debts.values())
-        self.savings = self.monthly_income - (total_expenses + total_bills + total_debt_payments)
-        return self.savings
-
-    def estimate_retirement_amount(self, desired_retirement_age):
-        years_until_retirement = desired_retirement_age - self.age
-        if years_until_retirement <= 0:
-            return "You are already at or past your desired retirement age."
-
-        current_savings = sum(inv["amount"] for inv in self.investments.values())
-        estimated_growth = current_savings
-
-        for _ in range(years_until_retirement):
-            estimated_growth += estimated_growth * 0.05  # Assuming 5% annual growth
-
-        return estimated_growth
-
-    def save_data(self, filename="budget_data.json"):
-        data = {
-            "age": self.age,
-            "annual_income": self.annual_income,
-            "expenses": self.expenses,
-            "bills": self.bills,
-            "investments": self.investments,
-            "debits": self.debts,
-            "financial_goals": self.financial_goals,
-            "incomes": self.incomes,
-        }
-        with open(filename, "w") as file:
-            json.dump(data, file, indent=4)
-        print(f"Data saved to {filename}")
-
-    def load_data(self, filename="budget_data.json"):
-        try:
-            with open(filename, "r") as file:
-                data = json.load(file)
-                self.age = data["age"]
-                self.annual_income = data["annual_income"]
-                self.expenses = data["expenses"]
-                self.bills = data["bills"]
-                self.investments = data["investments"]
-                self.debts = data["debits"]
-                self.financial_goals = data["financial_goals"]
-                self.incomes = data["incomes"]
-            print(f"Data loaded from {filename}")
-        except FileNotFoundError:
-            print(f"No data file found with the name {filename}")
-
-
 if __name__ == "__main__":
     # Create BudgetManager instance with default parameters
     budget_manager = BudgetManager(age=30, annual_income=50000)  
@@ -0,0 +1,267 @@
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+CHART_TYPES = ("Pie", "Line", "Bar", "Scatter")
+BAR_COLORS = ['#4CAF50', '#FFC107', '#2196F3', '#FF5722']
+OTHER_LABEL = "Other"
+TOP_CATEGORIES = 10  # Most slices/bars drawn, including the "Other" bucket
+
+
+def top_categories(categories, values, n=TOP_CATEGORIES):
+    """Keep the largest categories and fold the rest into a single "Other" entry.
+
+    At most n entries are returned, "Other" included. np.argpartition finds the
+    largest ones without sorting every category, and the kept categories stay in
+    their original order. The bucket is labelled with the number of categories
+    it holds, e.g. "Other (12 categories)", so it stays apart from a user
+    category called "Other". Returns (categories, values, folded_categories).
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    if len(categories) <= n:
+        return list(categories), list(values), []
+
+    amounts = np.asarray(values, dtype=float)
+    keep = np.zeros(len(amounts), dtype=bool)
+    if n > 1:  # With n == 1 everything goes into the bucket
+        keep[np.argpartition(amounts, len(amounts) - (n - 1))[len(amounts) - (n - 1):]] = True
+
+    kept = np.flatnonzero(keep)
+    folded = np.flatnonzero(~keep)
+    return (
+        [categories[i] for i in kept] + [f"{OTHER_LABEL} ({len(folded)} categories)"],
+        [values[i] for i in kept] + [float(amounts[folded].sum())],
+        [categories[i] for i in folded],
+    )
+
+
+def chart_data(budget_manager, top_n=TOP_CATEGORIES, only=None):
+    """Snapshot the numbers the charts are built from as plain, picklable data.
+
+    Categories beyond the top_n largest are folded into "Other" and listed in
+    "other_categories". Pass `only` to chart a subset of categories, e.g. the
+    contents of a previous "Other" bucket.
+    """
+    categories = list(budget_manager.expenses.keys())
+    if only is not None:
+        only = set(only)
+        categories = [cat for cat in categories if cat in only]
+    values = [sum(budget_manager.expenses[cat].values()) for cat in categories]
+    categories, values, other_categories = top_categories(categories, values, top_n)
+    return {
+        "categories": categories,
+        "values": values,
+        "other_categories": other_categories,
+        "total_income": sum(budget_manager.incomes.values()),
+        "monthly_savings": budget_manager.calculate_monthly_savings(),
+    }
+
+
+def savings_series(data):
+    """Return the (x, y) savings series for the Line chart.
+
+    A recorded history in data["savings_history"] (as {"x": [...], "y": [...]}) is used
+    when present, otherwise savings are projected over the next twelve months.
+    chart_data() does not record a history yet, so for now the apps always draw
+    the twelve-month projection.
+    """
+    history = data.get("savings_history")
+    if history:
+        return np.asarray(history["x"], dtype=float), np.asarray(history["y"], dtype=float)
+    months = np.arange(1, 13)
+    return months, np.cumsum([data["monthly_savings"] for _ in months])
+
+
+def lttb_downsample(x, y, threshold):
+    """Reduce a series to `threshold` points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Every bucket in between keeps the
+    point that forms the largest triangle with the point kept from the previous
+    bucket and the average of the next one, which preserves peaks and troughs.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # Bucket boundaries for the points between the first and the last one
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area for every candidate in the bucket
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        keep[i + 1] = previous
+
+    return x[keep], y[keep]
+
+
+class DownsampledLine:
+    """A line plot that only draws as many points as the axes is wide in pixels.
+
+    The full series is kept, and when the x-limits change (zoom or pan) the visible
+    range is downsampled again so detail comes back as the user zooms in.
+
+    Series no longer than the axes is wide are drawn as they are, which is the
+    case for the twelve-month projection, and the budget windows have no zoom
+    toolbar; refinement only happens where the limits are changed, e.g. with
+    ax.set_xlim() or on a canvas with a NavigationToolbar.
+    """
+
+    MARKER_LIMIT = 50  # Draw point markers only for short series
+
+    def __init__(self, ax, x, y, **kwargs):
+        self.ax = ax
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        kwargs.setdefault("marker", "o" if len(self.x) <= self.MARKER_LIMIT else None)
+        (self.line,) = ax.plot(*lttb_downsample(self.x, self.y, self.max_points()), **kwargs)
+        # A lambda is held strongly by the callback registry, which is reset by ax.clear()
+        ax.callbacks.connect("xlim_changed", lambda _ax: self.refine())
+
+    def max_points(self):
+        """One point per horizontal pixel of the axes."""
+        return max(int(self.ax.bbox.width), 3)
+
+    def refine(self):
+        """Downsample the part of the series inside the current x-limits."""
+        low, high = sorted(self.ax.get_xlim())
+        # Include one point on each side so the line runs to the edge of the view
+        start = max(np.searchsorted(self.x, low) - 1, 0)
+        end = min(np.searchsorted(self.x, high, side="right") + 1, len(self.x))
+        self.line.set_data(*lttb_downsample(self.x[start:end], self.y[start:end], self.max_points()))
+
+
+def draw_chart(ax, chart_type, data):
+    """Draw a chart type onto an axes and return the main artists (wedges, bars, ...)."""
+    categories = data["categories"]
+    values = data["values"]
+    artists = []
+
+    if chart_type == "Pie":
+        # ax.pie() raises when every wedge is zero, e.g. for a profile without expenses
+        if not any(values):
+            ax.text(0.5, 0.5, "No data available to display.", ha='center', va='center', fontsize=12)
+        else:
+            artists, _, _ = ax.pie(values, labels=categories, autopct='%1.1f%%')
+        ax.set_title('Expense Breakdown by Category')
+    elif chart_type == "Line":
+        months, savings = savings_series(data)
+        artists = [DownsampledLine(ax, months, savings).line]
+        ax.set_title('Savings Over Time')
+        ax.set_xlabel('Month')
+        ax.set_ylabel('Savings ($)')
+    elif chart_type == "Bar":
+        # Check if categories and values are present
+        if not categories or not values:
+            ax.text(0.5, 0.5, "No data available to display.", ha='center', va='center', fontsize=12)
+        else:
+            # Dynamically adjust based on the number of categories
+            max_categories = 10
+            rotation_angle = 45 if len(categories) > max_categories else 0
+            bar_width = max(0.8 - (len(categories) * 0.05), 0.2)  # Adjust width dynamically
+            font_size = max(12 - len(categories), 8)  # Font size reduces slightly with more categories
+
+            # Plot bar chart with dynamic adjustments
+            artists = ax.bar(categories, values, color=BAR_COLORS, width=bar_width)
+
+            # Enhance readability
+            ax.set_title('Expenses by Category', fontsize=14)
+            ax.set_xlabel('Category', fontsize=12)
+            ax.set_ylabel('Amount ($)', fontsize=12)
+
+            # Adjust x-ticks to avoid overlapping labels
+            ax.set_xticks(range(len(categories)))
+            ax.set_xticklabels(categories, rotation=rotation_angle, ha='right', fontsize=font_size, wrap=True)
+
+            # Add gridlines for easier comparison
+            ax.grid(axis='y', linestyle='--', alpha=0.6)
+
+            # Annotate bars with values for better insight
+            for bar in artists:
+                yval = bar.get_height()
+                ax.text(
+                    bar.get_x() + bar.get_width() / 2, yval,
+                    f'${yval:.2f}',
+                    ha='center', va='bottom', fontsize=font_size, color='black'
+                )
+
+            # Prevent labels from being clipped
+            ax.figure.tight_layout(pad=3)
+            ax.margins(0.1)  # Add some margin to the plot to avoid clipping bars
+    elif chart_type == "Scatter":
+        income_values = [data["total_income"]] * len(values)
+        artists = [ax.scatter(income_values, values)]
+        ax.set_title('Income vs. Expenses')
+        ax.set_xlabel('Income ($)')
+        ax.set_ylabel('Expenses ($)')
+
+    return artists
+
+
+def render_chart(chart_type, data, fmt="png", figsize=(10, 6), dpi=100):
+    """Render a chart with the Agg backend and return the encoded image bytes."""
+    # A bare Figure with an Agg canvas keeps pyplot and any GUI toolkit out of the picture
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    draw_chart(fig.add_subplot(111), chart_type, data)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def _render_job(job):
+    return render_chart(**job)
+
+
+class ChartRenderService:
+    """Renders charts in worker processes so heavy renders never block the Tk main thread.
+
+    Jobs are dicts with the arguments of render_chart(): chart_type, data and
+    optionally fmt ("png" or "svg"), figsize and dpi.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self.executor = None
+
+    def _get_executor(self):
+        # Workers are spawned on first use; spawn avoids forking a process that owns a Tk interpreter
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.executor
+
+    def submit(self, chart_type, data, fmt="png", **options):
+        """Queue a single chart render and return a Future resolving to the image bytes."""
+        job = dict(options, chart_type=chart_type, data=data, fmt=fmt)
+        return self._get_executor().submit(_render_job, job)
+
+    def render_batch(self, jobs):
+        """Render many charts in parallel and return their bytes in job order."""
+        return list(self._get_executor().map(_render_job, jobs))
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
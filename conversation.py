@@ -0,0 +1,84 @@
+import threading
+
+# Ollama runs models with a 2048-token context unless num_ctx is raised, and the reply has to
+# fit in it too, so the history sent with a prompt is kept well below that.
+DEFAULT_HISTORY_TOKENS = 1200
+CHARS_PER_TOKEN = 4  # Rough average for English text with Llama-style tokenizers
+MESSAGE_OVERHEAD_TOKENS = 4  # Role markers and separators the chat template adds per message
+
+
+def estimate_tokens(text):
+    """Cheap token estimate; close enough for budgeting without loading a tokenizer."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class Conversation:
+    """Multi-turn chat history that stays within a token budget.
+
+    Once the history grows past max_tokens the oldest exchanges are dropped in
+    one go, down to about `trim_to` of the budget, rather than one per turn. The
+    message prefix then stays the same for several turns, which lets the server
+    reuse its cached context for it instead of re-reading the whole history.
+    Dropped exchanges are folded into a running summary when a `summarize`
+    callable is given (summarize(previous_summary, dropped_messages) -> str),
+    otherwise they are forgotten. The last `keep_recent` exchanges are always
+    kept verbatim.
+    """
+
+    def __init__(self, system_prompt="", max_tokens=DEFAULT_HISTORY_TOKENS, keep_recent=1, trim_to=0.6, summarize=None):
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.trim_to = trim_to
+        self.summarize = summarize
+        self.summary = ""
+        self.turns = []  # {"role": ..., "content": ...} dicts, user and assistant alternating
+        self.lock = threading.Lock()  # Exchanges are added from AI worker threads
+
+    def _prefix(self, system_prompt=None):
+        system = self.system_prompt if system_prompt is None else system_prompt
+        if self.summary:
+            system = f"{system}\n\nSummary of the earlier conversation:\n{self.summary}".strip()
+        messages = [{"role": "system", "content": system}] if system else []
+        return messages + self.turns
+
+    @staticmethod
+    def count_tokens(messages):
+        return sum(estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+    def messages(self, system_prompt=None):
+        with self.lock:
+            return list(self._prefix(system_prompt))
+
+    def messages_for(self, prompt, system_prompt=None):
+        """Return the messages to send for a new prompt: history plus the prompt itself.
+
+        `system_prompt` replaces the conversation's own for this prompt only.
+        """
+        return self.messages(system_prompt) + [{"role": "user", "content": prompt}]
+
+    def token_count(self):
+        return self.count_tokens(self.messages())
+
+    def add_exchange(self, prompt, response):
+        """Record a completed prompt and response, trimming the history if it got too long."""
+        with self.lock:
+            self.turns.append({"role": "user", "content": prompt})
+            self.turns.append({"role": "assistant", "content": response})
+            if self.count_tokens(self._prefix()) > self.max_tokens:
+                self._trim()
+
+    def _trim(self):
+        target = self.max_tokens * self.trim_to
+        dropped = []
+        while len(self.turns) > 2 * self.keep_recent and self.count_tokens(self._prefix()) > target:
+            dropped.extend(self.turns[:2])
+            del self.turns[:2]
+        if dropped and self.summarize is not None:
+            self.summary = self.summarize(self.summary, dropped)
+
+    def reset(self):
+        """Forget the whole history, summary included."""
+        with self.lock:
+            self.turns.clear()
+            self.summary = ""
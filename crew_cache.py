@@ -0,0 +1,100 @@
+"""Disk cache and offline replay for the crew in main.py.
+
+Search tool results and LLM generations are stored in a ResponseCache file,
+keyed by the normalized query or prompt (plus the LLM's settings). Modes:
+
+    live    no caching, every call goes out
+    cache   answer from the cache when an entry is younger than the TTL,
+            otherwise call out and record the result (the default)
+    replay  only answer from the recording, whatever its age; a call that was
+            never recorded raises ReplayMissError instead of using the network
+
+Record a run once in cache mode, then replay it offline for fast,
+deterministic runs and benchmarks:
+
+    CREW_CACHE_MODE=replay python main.py
+"""
+import json
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from response_cache import ResponseCache
+
+MODES = ("live", "cache", "replay")
+DEFAULT_CREW_CACHE_PATH = "crew_cache.sqlite3"
+DEFAULT_CREW_CACHE_TTL = 7 * 24 * 3600  # Search results and answers go stale after a week
+
+
+class ReplayMissError(LookupError):
+    """A call in replay mode that has no recorded response."""
+
+
+class CrewCache:
+    """The store and mode shared by the cached tools and the LLM cache."""
+
+    def __init__(self, mode="cache", path=DEFAULT_CREW_CACHE_PATH, ttl=DEFAULT_CREW_CACHE_TTL):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode '{mode}'; use one of {', '.join(MODES)}")
+        self.mode = mode
+        # Replay uses whatever was recorded, so entries never expire there
+        self.store = ResponseCache(path, ttl=None if mode == "replay" else ttl)
+
+    def call(self, namespace, request, func, state=""):
+        """Return func() through the cache. request is the text the entry is keyed by."""
+        if self.mode == "live":
+            return func()
+        cached = self.store.get(namespace, request, state)
+        if cached is not None:
+            return json.loads(cached)
+        if self.mode == "replay":
+            raise ReplayMissError(f"No recorded {namespace} response for: {request[:200]}")
+        result = func()
+        self.store.put(namespace, request, json.dumps(result), state)
+        return result
+
+    def summary(self):
+        return f"Crew cache ({self.mode}): {self.store.hits} hits, {self.store.misses} misses"
+
+
+def cached_tool(tool_class, cache):
+    """Return a subclass of a crewai tool whose searches go through the cache.
+
+    Keyed by the tool's name and its arguments, e.g. the search query.
+    """
+
+    def _run(self, *args, **kwargs):
+        request = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str)
+        return cache.call(f"tool:{self.name}", request, lambda: tool_class._run(self, *args, **kwargs))
+
+    return type(f"Cached{tool_class.__name__}", (tool_class,), {"_run": _run})
+
+
+class CrewLLMCache(BaseCache):
+    """LangChain cache for the agents' chat models; pass it as ChatOpenAI(cache=...).
+
+    LangChain hands over the rendered prompt and a string of the model's
+    settings, so the same prompt sent with another model or temperature is a
+    separate entry.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def lookup(self, prompt, llm_string):
+        if self.cache.mode == "live":
+            return None
+        cached = self.cache.store.get("llm", prompt, llm_string)
+        if cached is not None:
+            return [loads(generation) for generation in json.loads(cached)]
+        if self.cache.mode == "replay":
+            raise ReplayMissError(f"No recorded LLM response for: {prompt[:200]}")
+        return None
+
+    def update(self, prompt, llm_string, return_val):
+        if self.cache.mode == "cache":
+            self.cache.store.put("llm", prompt, json.dumps([dumps(generation) for generation in return_val]),
+                                 llm_string)
+
+    def clear(self, **kwargs):
+        self.cache.store.invalidate("llm")
@@ -0,0 +1,164 @@
+"""Retrieval over the ledger for AI questions.
+
+Every ledger entry (expense, bill, income, debt, investment, goal) and every
+expense category total becomes a short text, embedded by the local model and
+kept as a row of a NumPy matrix. A question is embedded the same way and the
+k rows with the highest cosine similarity go into the prompt, so prompts stay
+small while answers can draw on the whole ledger.
+"""
+import threading
+
+import numpy as np
+
+from budget_context import money
+
+DEFAULT_EMBEDDING_MODEL = "nomic-embed-text"
+DEFAULT_TOP_K = 8
+EMBED_BATCH_SIZE = 64  # Texts per embedding request
+
+
+def ledger_documents(budget_manager):
+    """Return {key: text} for every entry of the budget. Keys stay the same while an entry exists."""
+    documents = {}
+    for category, expenses in budget_manager.expenses.items():
+        for name, amount in expenses.items():
+            documents[f"expense:{category}:{name}"] = (
+                f"Expense '{name}' in category {category}: {money(amount)} per month"
+            )
+        total = sum(expenses.values())
+        documents[f"category:{category}"] = (
+            f"Category {category}: {money(total)} per month over {len(expenses)} expenses"
+        )
+    for name, amount in budget_manager.bills.items():
+        documents[f"bill:{name}"] = f"Bill '{name}': {money(amount)} per month"
+    for name, amount in budget_manager.incomes.items():
+        documents[f"income:{name}"] = f"Income source '{name}': {money(amount)} per month"
+    for name, debt in budget_manager.debts.items():
+        documents[f"debt:{name}"] = (
+            f"Debt '{name}': {money(debt['amount'])} at {debt['interest_rate']}% interest, "
+            f"paying {money(debt['monthly_payment'])} per month"
+        )
+    for name, investment in budget_manager.investments.items():
+        documents[f"investment:{name}"] = (
+            f"Investment '{name}': {money(investment['amount'])} at {investment['rate']}% annual return"
+        )
+    for name, goal in budget_manager.financial_goals.items():
+        documents[f"goal:{name}"] = (
+            f"Goal '{name}': {money(goal['current_amount'])} saved of {money(goal['target_amount'])}"
+        )
+    return documents
+
+
+def ollama_embedder(model=DEFAULT_EMBEDDING_MODEL, timeout=None):
+    """Return embed(texts) -> list of vectors using the shared Ollama client."""
+    from ollama_client import get_client
+
+    def embed(texts):
+        return get_client(timeout).embed(model=model, input=list(texts)).embeddings
+
+    return embed
+
+
+class EmbeddingIndex:
+    """Unit-length embeddings in a growable NumPy matrix, searched by cosine similarity.
+
+    embed(texts) turns a list of texts into vectors. sync() brings the index in
+    line with a {key: text} dict and only embeds texts that are new or changed;
+    appends fill spare capacity (doubled when full) and removals move the last
+    row into the gap, so updates never copy the whole matrix. Safe to use from
+    worker threads.
+    """
+
+    def __init__(self, embed, initial_capacity=256):
+        self.embed = embed
+        self.initial_capacity = initial_capacity
+        self.matrix = None  # Allocated once the embedding size is known
+        self.keys = []  # Row -> key
+        self.texts = []  # Row -> text
+        self.rows = {}  # Key -> row
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _embed(self, texts):
+        vectors = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            vectors.extend(self.embed(texts[start:start + EMBED_BATCH_SIZE]))
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _append(self, key, text, vector):
+        count = len(self.keys)
+        if self.matrix is None:
+            self.matrix = np.empty((self.initial_capacity, vector.shape[0]), dtype=np.float32)
+        elif count == self.matrix.shape[0]:
+            grown = np.empty((count * 2, self.matrix.shape[1]), dtype=np.float32)
+            grown[:count] = self.matrix
+            self.matrix = grown
+        self.matrix[count] = vector
+        self.rows[key] = count
+        self.keys.append(key)
+        self.texts.append(text)
+
+    def _remove(self, key):
+        row = self.rows.pop(key)
+        last = len(self.keys) - 1
+        if row != last:
+            self.matrix[row] = self.matrix[last]
+            self.keys[row] = self.keys[last]
+            self.texts[row] = self.texts[last]
+            self.rows[self.keys[row]] = row
+        self.keys.pop()
+        self.texts.pop()
+
+    def _add(self, documents):
+        changed = {key: text for key, text in documents.items()
+                   if key not in self.rows or self.texts[self.rows[key]] != text}
+        if not changed:
+            return 0
+        vectors = self._embed(list(changed.values()))
+        for (key, text), vector in zip(changed.items(), vectors):
+            if key in self.rows:
+                self._remove(key)
+            self._append(key, text, vector)
+        return len(changed)
+
+    def add(self, documents):
+        """Add or replace entries from a {key: text} dict."""
+        with self.lock:
+            return self._add(documents)
+
+    def remove(self, keys):
+        with self.lock:
+            for key in keys:
+                if key in self.rows:
+                    self._remove(key)
+
+    def sync(self, documents):
+        """Make the index hold exactly `documents`; returns the number of texts embedded.
+
+        Removal and embedding happen under one lock, so two workers syncing at
+        once each see the index either before or after the other's sync.
+        """
+        with self.lock:
+            for key in [key for key in self.rows if key not in documents]:
+                self._remove(key)
+            return self._add(documents)
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """Return up to k (score, key, text) tuples, most similar first."""
+        if k <= 0:
+            return []
+        query_vector = self._embed([query])[0]
+        with self.lock:
+            count = len(self.keys)
+            if not count:
+                return []
+            scores = self.matrix[:count] @ query_vector
+            k = min(k, count)
+            # Only the top k need sorting
+            top = np.argpartition(scores, count - k)[count - k:] if k < count else np.arange(count)
+            top = top[np.argsort(scores[top])[::-1]]
+            return [(float(scores[row]), self.keys[row], self.texts[row]) for row in top]
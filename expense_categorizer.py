@@ -0,0 +1,222 @@
+"""Categorize imported expenses with the local model, many rows per prompt.
+
+Descriptions are reduced to a merchant key ("STARBUCKS #1234 SEATTLE" ->
+"starbucks seattle"). Keys matching a merchant rule (see merchant_rules) or
+seen before are answered without the model; the rest are deduplicated and
+sent in batches of `batch_size` as one numbered list per prompt, with
+Ollama's JSON output mode, so a statement of a few hundred rows costs a
+handful of requests.
+"""
+import csv
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prompt_pipeline import DEFAULT_MAX_CONCURRENCY
+
+EXPENSE_CATEGORIES = ("Housing", "Food", "Transportation", "Utilities", "Entertainment", "Healthcare", "Others")
+FALLBACK_CATEGORY = "Others"
+DEFAULT_BATCH_SIZE = 50  # Descriptions per prompt; small enough that the JSON answer stays short
+
+_NOISE = re.compile(r"[^a-z ]+")
+
+
+def merchant_key(description):
+    """Normalize a statement description so the same merchant always gets the same key."""
+    return " ".join(_NOISE.sub(" ", description.lower()).split())
+
+
+class MerchantCache:
+    """Merchant key -> category, kept in a JSON file."""
+
+    def __init__(self, path="merchant_categories.json"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.categories = None  # Loaded on first use
+
+    def _load(self):
+        if self.categories is None:
+            try:
+                with open(self.path) as file:
+                    self.categories = json.load(file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.categories = {}
+        return self.categories
+
+    def get(self, key):
+        with self.lock:
+            return self._load().get(key)
+
+    def update(self, categories):
+        """Store several results and write the file once."""
+        if not categories:
+            return
+        with self.lock:
+            self._load().update(categories)
+            # Write a temporary file and swap it in, so a crash never leaves half a file
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w") as file:
+                json.dump(self.categories, file, indent=1, sort_keys=True)
+            os.replace(temporary, self.path)
+
+
+class ExpenseCategorizer:
+    """Assigns one of `categories` to each expense description.
+
+    `rules` (a MerchantRules) are tried first and the merchant cache second.
+    Results the model gives for a merchant are cached and reused; rows the
+    model leaves out or answers with an unknown category get FALLBACK_CATEGORY
+    and are not cached, so they are asked again next time. `last_run` holds the
+    row counts and rows per second of the latest categorize() call.
+    """
+
+    def __init__(self, model_name, categories=EXPENSE_CATEGORIES, cache=None, batch_size=DEFAULT_BATCH_SIZE,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, timeout=None, rules=None):
+        self.model_name = model_name
+        self.categories = tuple(categories)
+        self.cache = cache if cache is not None else MerchantCache()
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.rules = rules
+        self.last_run = None
+
+    def prompt(self, merchants):
+        lines = "\n".join(f"{i}. {merchant}" for i, merchant in enumerate(merchants, 1))
+        return (
+            "Assign each expense below to exactly one of these categories: "
+            f"{', '.join(self.categories)}.\n"
+            'Answer with a JSON object mapping each line number to its category, e.g. {"1": "Food"}.\n\n'
+            f"{lines}"
+        )
+
+    def parse(self, merchants, content):
+        """Return {merchant key: category} for the lines the model answered with a known category."""
+        try:
+            answer = json.loads(content)
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(answer, dict):
+            return {}
+        # Some models nest the mapping, e.g. {"categories": {...}}
+        if len(answer) == 1 and isinstance(next(iter(answer.values())), dict):
+            answer = next(iter(answer.values()))
+        known = {category.lower(): category for category in self.categories}
+        results = {}
+        for number, category in answer.items():
+            try:
+                index = int(str(number).strip().rstrip(".")) - 1
+            except ValueError:
+                continue
+            if 0 <= index < len(merchants) and isinstance(category, str) and category.strip().lower() in known:
+                results[merchants[index]] = known[category.strip().lower()]
+        return results
+
+    def categorize_batch(self, merchants):
+        from ollama_client import get_client
+
+        response = get_client(self.timeout).chat(
+            model=self.model_name, messages=[{"role": "user", "content": self.prompt(merchants)}], format="json",
+            options={"temperature": 0},
+        )
+        return self.parse(merchants, response["message"]["content"])
+
+    def categorize(self, descriptions):
+        """Return a category for every description, in order."""
+        started = time.perf_counter()
+        keys = [merchant_key(description) for description in descriptions]
+        found = {}
+        missing = []
+        matched = 0
+        for key in dict.fromkeys(keys):
+            category = self.rules.match(key) if self.rules is not None else None
+            if category is not None:
+                matched += 1
+            else:
+                category = self.cache.get(key)
+            if category is not None:
+                found[key] = category
+            else:
+                missing.append(key)
+
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        learned = {}
+        failed = 0
+        if batches:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="categorize") as executor:
+                futures = [executor.submit(self.categorize_batch, batch) for batch in batches]
+                for future in futures:
+                    # A failed batch only costs its own merchants, which fall back to FALLBACK_CATEGORY
+                    try:
+                        learned.update(future.result())
+                    except Exception as e:
+                        failed += 1
+                        print(f"Categorizing a batch of expenses failed: {e}")
+        self.cache.update(learned)
+        found.update(learned)
+
+        elapsed = time.perf_counter() - started
+        self.last_run = {
+            "rows": len(descriptions), "merchants": len(found) + len(missing) - len(learned),
+            "matched": matched, "cached": len(found) - len(learned) - matched,
+            "asked": len(missing), "learned": len(learned),
+            "requests": len(batches), "failed_requests": failed, "seconds": round(elapsed, 2),
+            "rows_per_s": round(len(descriptions) / elapsed, 1) if elapsed else None,
+        }
+        return [found.get(key, FALLBACK_CATEGORY) for key in keys]
+
+
+DESCRIPTION_COLUMNS = ("description", "name", "merchant", "payee", "memo")
+AMOUNT_COLUMNS = ("amount", "value")
+
+
+def statement_columns(fieldnames):
+    """Return (description column, amount column, whether it is a debit-only column) for a CSV header."""
+    columns = {name.strip().lower(): name for name in fieldnames or ()}
+    description_column = next((columns[name] for name in DESCRIPTION_COLUMNS if name in columns), None)
+    if "debit" in columns:
+        return description_column, columns["debit"], True
+    amount_column = next((columns[name] for name in AMOUNT_COLUMNS if name in columns), None)
+    return description_column, amount_column, False
+
+
+def has_debit_column(path):
+    """Whether a statement lists expenses in their own debit column, so the sign convention does not matter."""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        return statement_columns(csv.DictReader(file).fieldnames)[2]
+
+
+def read_statement(path, expenses_negative=True):
+    """Read the (description, amount) expense rows of a bank statement CSV.
+
+    The description comes from the first of the columns description, name,
+    merchant, payee or memo. With a debit column, its non-empty values are the
+    expenses and rows with only a credit are skipped. Otherwise the amount (or
+    value) column is signed: with `expenses_negative` (most banks) negative
+    amounts are expenses and positive ones, such as salary deposits, refunds and
+    card payments, are skipped; without it the convention is the other way round.
+    Returned amounts are positive. Empty and unparsable rows are skipped.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        description_column, amount_column, debit_only = statement_columns(reader.fieldnames)
+        if description_column is None or amount_column is None:
+            raise ValueError("The statement needs a description and an amount or debit column")
+        rows = []
+        for row in reader:
+            description = (row[description_column] or "").strip()
+            try:
+                amount = float((row[amount_column] or "").replace(",", "").replace("$", ""))
+            except ValueError:
+                continue
+            if not debit_only:
+                if expenses_negative:
+                    amount = -amount
+                if amount <= 0:
+                    continue  # A credit
+            if description and amount:
+                rows.append((description, abs(amount)))
+        return rows
@@ -0,0 +1,165 @@
+import collections
+import contextlib
+import functools
+import json
+import statistics
+import time
+
+
+class EventLoopMonitor:
+    """Times Tk callbacks and chart draws and measures event-loop lag for a window.
+
+    Callback and draw timings go to a ring buffer, lag samples from a periodic
+    after() heartbeat to a second one, so old entries fall off on their own.
+    Everything can be dumped to a JSON file or shown in a debug overlay (F12).
+    """
+
+    def __init__(self, root, capacity=2000, heartbeat_ms=100, dump_path="event_loop_profile.json"):
+        self.root = root
+        self.records = collections.deque(maxlen=capacity)  # (wall time, kind, name, duration ms)
+        self.lag_samples = collections.deque(maxlen=capacity)  # (wall time, lag ms)
+        self.heartbeat_ms = heartbeat_ms
+        self.dump_path = dump_path
+        self.heartbeat_job = None
+        self.expected_beat = None
+        self.overlay = None
+        self.overlay_job = None
+
+    def record(self, kind, name, duration_ms):
+        self.records.append((time.time(), kind, name, duration_ms))
+
+    @contextlib.contextmanager
+    def measure(self, kind, name):
+        """Time the body of a with-block, e.g. a canvas draw."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, (time.perf_counter() - started) * 1000)
+
+    def timed(self, func, name=None):
+        """Wrap a callback so every call is timed."""
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.measure("callback", name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def instrument(self, obj, method_names):
+        """Replace methods on an instance with timed versions.
+
+        Call this before the widgets are created so button commands, key bindings
+        and matplotlib event connections pick up the wrapped methods.
+        """
+        for name in method_names:
+            setattr(obj, name, self.timed(getattr(obj, name), name))
+
+    def install_shortcuts(self):
+        """F12 toggles the debug overlay, Ctrl+Shift+D dumps the buffers to a file."""
+        self.root.bind_all("<F12>", lambda event: self.toggle_overlay())
+        self.root.bind_all("<Control-D>", lambda event: print(f"Event loop profile saved to {self.dump()}"))
+
+    def start(self):
+        """Start the heartbeat that measures how late the event loop runs timers."""
+        self.expected_beat = time.perf_counter() + self.heartbeat_ms / 1000
+        self.heartbeat_job = self.root.after(self.heartbeat_ms, self._beat)
+
+    def stop(self):
+        if self.heartbeat_job is not None:
+            self.root.after_cancel(self.heartbeat_job)
+            self.heartbeat_job = None
+        self._close_overlay()
+
+    def _beat(self):
+        # A timer that fires late means the main thread was busy for that long
+        lag_ms = max((time.perf_counter() - self.expected_beat) * 1000, 0)
+        self.lag_samples.append((time.time(), lag_ms))
+        self.start()
+
+    def summary(self):
+        """Return per-callback statistics, slowest first, plus event-loop lag."""
+        durations = collections.defaultdict(list)
+        for _, kind, name, duration_ms in self.records:
+            durations[(kind, name)].append(duration_ms)
+
+        rows = []
+        for (kind, name), values in durations.items():
+            values.sort()
+            rows.append({
+                "kind": kind,
+                "name": name,
+                "count": len(values),
+                "mean_ms": round(statistics.fmean(values), 2),
+                "p95_ms": round(values[int(0.95 * (len(values) - 1))], 2),
+                "max_ms": round(values[-1], 2),
+            })
+        rows.sort(key=lambda row: row["max_ms"], reverse=True)
+
+        lags = sorted(lag for _, lag in self.lag_samples)
+        lag = {
+            "samples": len(lags),
+            "p95_ms": round(lags[int(0.95 * (len(lags) - 1))], 2) if lags else None,
+            "max_ms": round(lags[-1], 2) if lags else None,
+        }
+        return {"callbacks": rows, "event_loop_lag": lag}
+
+    def dump(self, path=None):
+        """Write the summary and the raw ring buffers to a JSON file and return its path."""
+        path = path or self.dump_path
+        data = {
+            "summary": self.summary(),
+            "records": [
+                {"time": wall_time, "kind": kind, "name": name, "duration_ms": round(duration_ms, 3)}
+                for wall_time, kind, name, duration_ms in self.records
+            ],
+            "event_loop_lag": [
+                {"time": wall_time, "lag_ms": round(lag_ms, 3)} for wall_time, lag_ms in self.lag_samples
+            ],
+        }
+        with open(path, "w") as file:
+            json.dump(data, file, indent=4)
+        return path
+
+    def format_summary(self, limit=15):
+        summary = self.summary()
+        lag = summary["event_loop_lag"]
+        lines = [f"Event loop lag: p95 {lag['p95_ms']} ms, max {lag['max_ms']} ms ({lag['samples']} samples)", ""]
+        lines.append(f"{'callback':<32}{'count':>7}{'mean':>10}{'p95':>10}{'max':>10}")
+        for row in summary["callbacks"][:limit]:
+            label = f"{row['kind']}:{row['name']}"[:31]
+            lines.append(f"{label:<32}{row['count']:>7}{row['mean_ms']:>10}{row['p95_ms']:>10}{row['max_ms']:>10}")
+        return "\n".join(lines)
+
+    def toggle_overlay(self):
+        """Show or hide a small window with the slowest callbacks, refreshed every second."""
+        import tkinter as tk
+
+        if self.overlay is not None:
+            self._close_overlay()
+            return
+
+        self.overlay = tk.Toplevel(self.root)
+        self.overlay.title("Event loop profile")
+        self.overlay.attributes("-topmost", True)
+        text = tk.Text(self.overlay, width=70, height=20, font=("Courier", 10), bg="#2b2b2b", fg="white")
+        text.pack(fill=tk.BOTH, expand=1)
+        self.overlay.protocol("WM_DELETE_WINDOW", self.toggle_overlay)
+
+        def refresh():
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, self.format_summary())
+            self.overlay_job = self.overlay.after(1000, refresh)
+
+        refresh()
+
+    def _close_overlay(self):
+        if self.overlay is None:
+            return
+        if self.overlay_job is not None:
+            self.overlay.after_cancel(self.overlay_job)
+            self.overlay_job = None
+        self.overlay.destroy()
+        self.overlay = None
@@ -0,0 +1,73 @@
+"""Non-blocking, size-bounded logging for long agent runs.
+
+setup_logging() puts a QueueHandler on the root logger, so a log call only
+enqueues the record; a QueueListener thread formats it and writes it to a
+RotatingFileHandler. Calling threads never wait on the disk, and the log
+files never take more than max_bytes * (backup_count + 1).
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+# HTTP clients log every connection and header at DEBUG, which drowns out the agents' output
+DEFAULT_LEVELS = {"httpcore": "WARNING", "httpx": "INFO", "openai": "INFO", "urllib3": "INFO"}
+
+
+def parse_levels(text):
+    """Parse "httpx:WARNING, crewai:INFO" into {"httpx": "WARNING", "crewai": "INFO"}.
+
+    Entries without a logger name or a level, e.g. "httpx" or "httpx:", are skipped.
+    """
+    levels = {}
+    for item in text.split(","):
+        name, _, level = item.partition(":")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class StoppableQueueListener(QueueListener):
+    """A QueueListener whose stop() may be called again, e.g. by the caller and then at exit."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stopped = True  # Until start()
+
+    def start(self):
+        self.stopped = False
+        super().start()
+
+    def stop(self):
+        if not self.stopped:
+            self.stopped = True
+            super().stop()
+
+
+def setup_logging(filename="logs.log", level=logging.DEBUG, levels=None, max_bytes=DEFAULT_MAX_BYTES,
+                  backup_count=DEFAULT_BACKUP_COUNT):
+    """Route all logging through a queue to a rotating file and return the running QueueListener.
+
+    `levels` maps logger names to levels and is applied on top of DEFAULT_LEVELS.
+    The listener is stopped at exit, which flushes the records still queued.
+    """
+    file_handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+    for name, logger_level in {**DEFAULT_LEVELS, **(levels or {})}.items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    listener = StoppableQueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
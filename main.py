@@ -1,94 +1,230 @@
+import argparse
+import math
 import os
+import queue
+import threading
+import time
 from crewai import Agent, Task, Crew
 from crewai_tools import SerperDevTool
 from langchain_openai import ChatOpenAI
 import configparser
 import logging
-
-# Set up logging
-logging.basicConfig(level=logging.DEBUG, filename="logs.log", format='%(asctime)s [%(levelname)s]: %(message)s')
+from crew_cache import CrewCache, CrewLLMCache, cached_tool
+from log_setup import DEFAULT_BACKUP_COUNT, DEFAULT_MAX_BYTES, parse_levels, setup_logging
 
 # Load configuration settings from env.ini
 config = configparser.ConfigParser()
 config.read('env.ini')
 
-# Retrieve API keys from the config file
-OPENAI_API_KEY = config['OPEN_AI']['OPENAI_API_KEY']
-SERPER_API_KEY = config['SERPER']['SERPER_API_KEY']
+# Set up logging: records go through a queue to a rotating file, so agent threads never block on
+# disk writes. Per-module levels come from env.ini, e.g. [LOGGING] levels = crewai:INFO, httpx:WARNING
+setup_logging(
+    filename=config.get('LOGGING', 'file', fallback="logs.log"),
+    level=config.get('LOGGING', 'level', fallback="DEBUG").upper(),
+    levels=parse_levels(config.get('LOGGING', 'levels', fallback="")),
+    max_bytes=config.getint('LOGGING', 'max_bytes', fallback=DEFAULT_MAX_BYTES),
+    backup_count=config.getint('LOGGING', 'backup_count', fallback=DEFAULT_BACKUP_COUNT),
+)
+
+# Searches and LLM answers are cached on disk: "live", "cache" or "replay" (offline, from
+# recorded responses only); see crew_cache.py. CREW_CACHE_MODE overrides env.ini.
+CACHE_MODE = os.environ.get("CREW_CACHE_MODE") or config.get('CACHE', 'mode', fallback="cache")
+crew_cache = CrewCache(CACHE_MODE)
+llm_cache = CrewLLMCache(crew_cache)
+
+# Retrieve API keys from the config file; a replay never calls the APIs and needs none
+if CACHE_MODE == "replay":
+    OPENAI_API_KEY = config.get('OPEN_AI', 'OPENAI_API_KEY', fallback="replay")
+    SERPER_API_KEY = config.get('SERPER', 'SERPER_API_KEY', fallback="replay")
+else:
+    OPENAI_API_KEY = config['OPEN_AI']['OPENAI_API_KEY']
+    SERPER_API_KEY = config['SERPER']['SERPER_API_KEY']
 
 # Initialize the search tool with the Serper API key
-search_tool = SerperDevTool(api_key=SERPER_API_KEY)
-
-# Define your agents with roles and goals
-researcher = Agent(
-    role="Senior Research Assistant",
-    goal="Look up the latest advancements in AI agents.",
-    backstory="""You work at a leading tech think tank.
-    Your expertise lies in searching Google for AI Agent frameworks.
-    You have a knack for dissecting complex data and presenting actionable insights.""",
-    verbose=True,
-    allow_delegation=False,
-    tools=[search_tool],
-    llm=ChatOpenAI(
-        api_key=OPENAI_API_KEY,  # Provide the OpenAI API key
-        model_name="gpt-4-turbo-preview",
-        temperature=0.2,
-        max_tokens=200,  # Adjust max tokens based on needs
-        top_p=0.9,
-        frequency_penalty=0.2,
-        presence_penalty=0.3
-    ),
-    max_iterations=200,  # Increase iterations further
-    max_time=3600  # Increase time limit further (60 minutes)
-)
+search_tool = cached_tool(SerperDevTool, crew_cache)(api_key=SERPER_API_KEY)
 
-writer = Agent(
-    role="Professional Short-Article Writer",
-    goal="Summarize the latest advancements in AI agents in a concise article.",
-    backstory="""You are a renowned Content Strategist, known for your insightful and engaging articles.
-    You transform complex concepts into compelling narratives.""",
-    verbose=True,
-    allow_delegation=True,
-    llm=ChatOpenAI(
-        api_key=OPENAI_API_KEY,  # Provide the OpenAI API key
-        model_name="gpt-4-turbo-preview",
-        temperature=0.7,
-        max_tokens=300,  # Adjust max tokens based on needs
-        top_p=0.85,
-        frequency_penalty=0.1,
-        presence_penalty=0.6
-    ),
-    max_iterations=200,  # Increase iterations further
-    max_time=3600  # Increase time limit further (60 minutes)
-)
+DEFAULT_TOPIC = "AI Agents"
+MAX_CONCURRENT_CREWS = 4  # Crews running at once; each makes its own search and OpenAI calls
+TASK_TIME_LIMIT = 600  # Seconds an agent may spend on one task before crewai stops it
 
-# Create tasks for your agents
-task1 = Task(
-    description="""Conduct a comprehensive analysis of the latest advancements in AI Agents in March 2024.
-    Identify key trends, breakthrough technologies, and potential industry impacts.""",
-    expected_output="Full analysis report in bullet points",
-    agent=researcher
+# The chat models are shared by every crew; the clients are thread-safe and reuse connections
+researcher_llm = ChatOpenAI(
+    api_key=OPENAI_API_KEY,  # Provide the OpenAI API key
+    model_name="gpt-4-turbo-preview",
+    temperature=0.2,
+    max_tokens=200,  # Adjust max tokens based on needs
+    top_p=0.9,
+    frequency_penalty=0.2,
+    presence_penalty=0.3,
+    cache=llm_cache
 )
-
-task2 = Task(
-    description="""Using the insights provided, write a short article
-    that highlights the most significant AI Agent advancements.
-    Your post should be informative yet accessible, catering to a tech-savvy audience.
-    Make it sound cool, avoid complex words so it doesn't sound like AI.""",
-    expected_output="Full blog post of at least 3 paragraphs",
-    agent=writer
+writer_llm = ChatOpenAI(
+    api_key=OPENAI_API_KEY,  # Provide the OpenAI API key
+    model_name="gpt-4-turbo-preview",
+    temperature=0.7,
+    max_tokens=300,  # Adjust max tokens based on needs
+    top_p=0.85,
+    frequency_penalty=0.1,
+    presence_penalty=0.6,
+    cache=llm_cache
 )
 
-# Instantiate your crew with a sequential process
-crew = Crew(
-    agents=[researcher, writer],
-    tasks=[task1, task2],
-    verbose=True
-)
 
-# Kick off the crew process and get results
-result = crew.kickoff()
+def build_crew(topic, time_limit=TASK_TIME_LIMIT, verbose=True):
+    """Create the researcher -> writer crew for one topic."""
+    # Define your agents with roles and goals
+    researcher = Agent(
+        role="Senior Research Assistant",
+        goal=f"Look up the latest advancements in {topic}.",
+        backstory=f"""You work at a leading tech think tank.
+        Your expertise lies in searching Google for news and developments about {topic}.
+        You have a knack for dissecting complex data and presenting actionable insights.""",
+        verbose=verbose,
+        allow_delegation=False,
+        tools=[search_tool],
+        llm=researcher_llm,
+        max_iter=200,
+        max_execution_time=time_limit
+    )
+
+    writer = Agent(
+        role="Professional Short-Article Writer",
+        goal=f"Summarize the latest advancements in {topic} in a concise article.",
+        backstory="""You are a renowned Content Strategist, known for your insightful and engaging articles.
+        You transform complex concepts into compelling narratives.""",
+        verbose=verbose,
+        allow_delegation=True,
+        llm=writer_llm,
+        max_iter=200,
+        max_execution_time=time_limit
+    )
+
+    # Create tasks for your agents
+    task1 = Task(
+        description=f"""Conduct a comprehensive analysis of the latest advancements in {topic}.
+        Identify key trends, breakthrough technologies, and potential industry impacts.""",
+        expected_output="Full analysis report in bullet points",
+        agent=researcher
+    )
+
+    task2 = Task(
+        description=f"""Using the insights provided, write a short article
+        that highlights the most significant advancements in {topic}.
+        Your post should be informative yet accessible, catering to a tech-savvy audience.
+        Make it sound cool, avoid complex words so it doesn't sound like AI.""",
+        expected_output="Full blog post of at least 3 paragraphs",
+        agent=writer
+    )
+
+    # Instantiate your crew with a sequential process
+    return Crew(
+        agents=[researcher, writer],
+        tasks=[task1, task2],
+        verbose=verbose
+    )
+
+
+def run_topic(topic, time_limit=TASK_TIME_LIMIT, verbose=True):
+    started = time.perf_counter()
+    result = build_crew(topic, time_limit, verbose).kickoff()
+    return result, time.perf_counter() - started
+
+
+def run_topics(topics, max_workers=MAX_CONCURRENT_CREWS, time_limit=TASK_TIME_LIMIT, on_result=None):
+    """Run one crew per topic, max_workers at a time, and return {topic: (result or error, seconds)}.
+
+    Duplicate topics are run once. on_result(topic, result, seconds, error) is
+    called as each topic finishes. Each crew has two tasks of at most time_limit
+    seconds; topics still unfinished when every batch of crews could have used
+    its full time are reported as timed out. The crews run on daemon threads, so
+    stuck ones are abandoned rather than keeping the process alive after that.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    topics = list(dict.fromkeys(topics))
+    verbose = len(topics) == 1  # Interleaved agent logs from parallel crews are unreadable
+    waiting = queue.SimpleQueue()
+    finished = queue.SimpleQueue()
+    for topic in topics:
+        waiting.put(topic)
+
+    def work():
+        while True:
+            try:
+                topic = waiting.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                result, seconds = run_topic(topic, time_limit, verbose)
+                finished.put((topic, result, seconds, None))
+            except Exception as e:
+                logging.exception("Crew for topic %r failed", topic)
+                finished.put((topic, None, None, e))
+
+    # Not a ThreadPoolExecutor: its threads are joined at interpreter exit, even after a timeout
+    for i in range(min(max_workers, len(topics))):
+        threading.Thread(target=work, name=f"crew-{i}", daemon=True).start()
+
+    timeout = 2 * time_limit * math.ceil(len(topics) / max_workers) + 60
+    deadline = time.monotonic() + timeout
+    results = {}
+    while len(results) < len(topics):
+        try:
+            topic, result, seconds, error = finished.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
+            break
+        results[topic] = (error or result, seconds)
+        if on_result is not None:
+            on_result(topic, result, seconds, error)
+
+    for topic in topics:
+        if topic not in results:
+            error = TimeoutError(f"No result within {timeout} seconds")
+            results[topic] = (error, None)
+            if on_result is not None:
+                on_result(topic, None, None, error)
+    return results
+
+
+def print_result(topic, result, seconds, error):
+    print("##############")
+    if error is not None:
+        print(f"{topic}: failed ({error})")
+    else:
+        print(f"{topic} ({seconds:.1f}s)")
+        print(result)
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Research and write a short article per topic.")
+    parser.add_argument("topics", nargs="*", help=f"Topics (default: {DEFAULT_TOPIC})")
+    parser.add_argument("--topics-file", help="File with one topic per line, run along with the topics given")
+    parser.add_argument("--workers", type=positive_int, default=MAX_CONCURRENT_CREWS, help="Crews running at once")
+    parser.add_argument("--time-limit", type=positive_int, default=TASK_TIME_LIMIT, help="Seconds per agent task")
+    args = parser.parse_args()
+
+    topics = list(args.topics)
+    if args.topics_file:
+        with open(args.topics_file) as file:
+            topics += [line.strip() for line in file if line.strip()]
+    topics = list(dict.fromkeys(topics or [DEFAULT_TOPIC]))  # Results are keyed by topic, so each runs once
+
+    # Kick off the crews and display each result as it comes in
+    started = time.perf_counter()
+    results = run_topics(topics, args.workers, args.time_limit, on_result=print_result)
+    failed = sum(isinstance(result, Exception) for result, _ in results.values())
+    print("##############")
+    print(f"{len(topics) - failed}/{len(topics)} topics done in {time.perf_counter() - started:.1f}s "
+          f"with {args.workers} workers")
+    print(crew_cache.summary())
+
 
-# Display the result
-print("##############")
-print(result)
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,46 @@
 import customtkinter as ctk
-import subprocess
-import ollama
+from tkinter import messagebox
+from ai_chat import DEFAULT_KEEP_ALIVE, KEEP_ALIVE_REFRESH_MS, warm_up_model
+from ai_scheduler import PRIORITY_BACKGROUND
+from ai_tasks import DEFAULT_TIMEOUT, AIRunner
+from conversation import Conversation
+from ollama_client import get_client
+from instrumentation import EventLoopMonitor
 
 # Define a class for interacting with the AI model
 class AIChat:
-    def __init__(self, model_name):
+    def __init__(self, model_name, timeout=None, keep_alive=DEFAULT_KEEP_ALIVE):
         self.model_name = model_name
-        # self.ensure_model()
-
-    # def ensure_model(self):
-    #     """Pull the model if it's not already available."""
-    #     try:
-    #         result = subprocess.run(["ollama", "pull", self.model_name], check=True, capture_output=True, text=True)
-    #         print(f"Model {self.model_name} pulled successfully:\n{result.stdout}")
-    #     except subprocess.CalledProcessError as e:
-    #         ctk.CTkMessagebox.show_error("Model Error", f"Failed to pull the model {self.model_name}. Error: {e.stderr}")
-    #     except FileNotFoundError:
-    #         ctk.CTkMessagebox.show_error("CLI Error", "Ollama CLI not found. Ensure that Ollama is installed and in your PATH.")
-    #         # exit()
+        self.client = get_client(timeout)
+        self.keep_alive = keep_alive  # Keeps the model loaded between prompts
+        self.conversation = Conversation()  # Chat history, trimmed to fit the model's context
+
+    def warm_up(self, pull=False):
+        """Pull the model if allowed and missing, and load it; returns a status message."""
+        return warm_up_model(self.client, self.model_name, pull, self.keep_alive)
 
     def generate_response(self, prompt):
-        """Generate a response from the AI model using a prompt."""
-        try:
-            response = ollama.chat(model=self.model_name, messages=[{"role": "user", "content": prompt}])
-            return response["message"]["content"]
-        except Exception as e:
-            ctk.CTkMessagebox.show_error("API Error", f"An error occurred while generating the response: {e}")
-            return None
+        """Generate a response from the AI model using a prompt.
+
+        Runs on a worker thread, so errors are raised for the caller to report on the Tk thread.
+        """
+        response = self.client.chat(model=self.model_name, messages=[{"role": "user", "content": prompt}],
+                                    keep_alive=self.keep_alive)
+        return response["message"]["content"]
+
+    def stream_chat(self, prompt):
+        """Yield the response chunk by chunk, sending the conversation so far with the prompt."""
+        parts = []
+        for chunk in self.client.chat(model=self.model_name, messages=self.conversation.messages_for(prompt), stream=True,
+                                      keep_alive=self.keep_alive):
+            parts.append(chunk["message"]["content"])
+            yield parts[-1]
+        # Only completed answers become part of the history
+        self.conversation.add_exchange(prompt, "".join(parts))
 
 # Define a class for the GUI application
 class ChatApp:
-    def __init__(self, root):
+    def __init__(self, root, warm_up=True, allow_model_pull=False):
         self.root = root
         self.root.title("AI Chat Application")
         self.root.geometry("800x600")  # Set initial window size
@@ -38,10 +48,41 @@ class ChatApp:
         self.root.grid_rowconfigure(0, weight=1)
         self.root.grid_columnconfigure(0, weight=1)
 
-        self.ai_chat = AIChat("llama3.1")
+        self.ai_chat = AIChat("llama3.1", timeout=DEFAULT_TIMEOUT)
+        self.ai_runner = AIRunner(self.root)
+        self.ai_task = None
+        self.allow_model_pull = allow_model_pull
+
+        # Time the send handler (button and <Return>) and watch event-loop lag
+        self.monitor = EventLoopMonitor(self.root)
+        self.monitor.instrument(self, ("send_prompt", "cancel_prompt", "append_tokens"))
 
         # Create the GUI layout
         self.create_widgets()
+        self.monitor.install_shortcuts()
+        self.monitor.start()
+        if warm_up:
+            # Load the model in the background once the window is up, so the first prompt is fast
+            self.root.after_idle(self.start_warm_up)
+
+    def start_warm_up(self):
+        self.status_label.configure(text=f"Loading {self.ai_chat.model_name}...")
+        self.ai_runner.submit(
+            self.ai_chat.warm_up, self.allow_model_pull,
+            on_done=self.show_model_status, on_error=self.show_model_status, priority=PRIORITY_BACKGROUND,
+        )
+        self.root.after(KEEP_ALIVE_REFRESH_MS, self.refresh_keep_alive)
+
+    def refresh_keep_alive(self):
+        # Reload the model if it was unloaded; a no-op for the server while it is still resident
+        if self.ai_task is None:
+            self.ai_runner.submit(self.ai_chat.warm_up, on_done=lambda status: None,
+                                  on_error=self.show_model_status, priority=PRIORITY_BACKGROUND)
+        self.root.after(KEEP_ALIVE_REFRESH_MS, self.refresh_keep_alive)
+
+    def show_model_status(self, status):
+        if self.ai_task is None:
+            self.status_label.configure(text=f"Model: {status}")
 
     def create_widgets(self):
         # Frame for the main content
@@ -68,6 +109,13 @@ class ChatApp:
         self.send_button = ctk.CTkButton(self.entry_frame, text="Send", command=self.send_prompt)
         self.send_button.grid(row=0, column=1, padx=5, pady=10)
 
+        # Cancel the request in flight; the status label shows how long it has been waiting
+        self.cancel_button = ctk.CTkButton(self.entry_frame, text="Cancel", command=self.cancel_prompt, state="disabled")
+        self.cancel_button.grid(row=0, column=2, padx=5, pady=10)
+
+        self.status_label = ctk.CTkLabel(self.main_frame, text="", anchor="w")
+        self.status_label.grid(row=2, column=0, padx=10, sticky="w")
+
     def send_prompt(self):
         # Get the user input prompt
         prompt = self.prompt_entry.get().strip()
@@ -75,19 +123,61 @@ class ChatApp:
             ctk.CTkMessagebox.show_warning("Input Error", "Please enter a prompt.")
             return
 
+        if self.ai_task is not None:
+            # The new prompt supersedes the unfinished answer, which is not added to the history
+            self.text_area.insert("end", " [superseded]\n")
+
         # Display the user's prompt in the text area
         self.text_area.insert("end", f"User: {prompt}\n")
 
-        # Generate the AI response
-        response = self.ai_chat.generate_response(prompt)
-        if response:
-            # Display the AI's response in the text area
-            self.text_area.insert("end", f"AI: {response}\n")
+        # Generate the AI response on a worker thread; sending again cancels this one (same key)
+        self.cancel_button.configure(state="normal")
+        self.ai_task = self.ai_runner.submit_stream(
+            self.ai_chat.stream_chat, prompt,
+            on_token=self.append_tokens, on_done=self.show_response, on_error=self.show_error,
+            on_status=self.show_status, key="chat",
+        )
+        self.text_area.insert("end", "AI: ")
 
         # Clear the entry field
         self.prompt_entry.delete(0, "end")
         self.text_area.see("end")
 
+    def show_status(self, task):
+        if not task.running:
+            state = "Waiting for the model"
+        else:
+            state = "AI is thinking" if task.first_token_at is None else "AI is answering"
+        self.status_label.configure(text=f"{state}... {task.elapsed:.0f}s")
+
+    def append_tokens(self, text):
+        """Display the tokens streamed since the last frame in the text area."""
+        self.text_area.insert("end", text)
+        self.text_area.see("end")
+
+    def show_response(self, response):
+        if response:
+            self.finish_request(self.ai_task.timing_summary())
+        else:
+            self.finish_request()
+
+    def show_error(self, error):
+        self.finish_request()
+        messagebox.showerror("API Error", f"An error occurred while generating the response: {error}")
+
+    def cancel_prompt(self):
+        """Stop waiting for the current response."""
+        if self.ai_task is not None:
+            self.ai_task.cancel()
+            self.finish_request("Request cancelled.")
+
+    def finish_request(self, status=""):
+        self.ai_task = None
+        self.text_area.insert("end", "\n")
+        self.text_area.see("end")
+        self.status_label.configure(text=status)
+        self.cancel_button.configure(state="disabled")
+
 # Run the application
 if __name__ == "__main__":
     ctk.set_appearance_mode("System")  # Modes: "System" (default), "Dark", "Light"
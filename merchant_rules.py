@@ -0,0 +1,125 @@
+"""Deterministic merchant -> category rules, checked before asking the model.
+
+Rules map a pattern to a category, e.g. {"uber": "Transportation",
+"whole foods": "Food", "amzn*": "Others"}. Patterns are matched as whole
+words of the normalized description (see expense_categorizer.merchant_key);
+a trailing "*" also matches words that start with the pattern. All patterns
+are compiled into one Aho-Corasick automaton, so a description is scanned
+once however many rules there are. When several patterns match, the longest
+wins, then the one listed first.
+"""
+import json
+from collections import deque
+
+from expense_categorizer import merchant_key
+
+DEFAULT_RULES = {
+    "rent": "Housing", "mortgage": "Housing", "hoa": "Housing",
+    "grocery": "Food", "groceries": "Food", "supermarket": "Food", "restaurant": "Food", "cafe": "Food",
+    "starbucks": "Food", "mcdonalds": "Food", "whole foods": "Food", "trader joe": "Food", "doordash": "Food",
+    "uber": "Transportation", "lyft": "Transportation", "shell": "Transportation", "chevron": "Transportation",
+    "parking": "Transportation", "transit": "Transportation", "airlines": "Transportation",
+    "electric": "Utilities", "water": "Utilities", "internet": "Utilities", "comcast": "Utilities",
+    "verizon": "Utilities", "at t": "Utilities",
+    "netflix": "Entertainment", "spotify": "Entertainment", "hulu": "Entertainment", "cinema": "Entertainment",
+    "steam": "Entertainment",
+    "pharmacy": "Healthcare", "cvs": "Healthcare", "walgreens": "Healthcare", "dental": "Healthcare",
+    "clinic": "Healthcare", "hospital": "Healthcare",
+}
+MEMO_SIZE = 100_000  # Descriptions remembered with their result; statements repeat merchants a lot
+
+
+class MerchantRules:
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = dict(rules)
+        self.memo = {}
+        self._compile()
+
+    @classmethod
+    def load(cls, path="merchant_rules.json"):
+        """Rules from a JSON object of pattern -> category, or the defaults if there is no file."""
+        try:
+            with open(path) as file:
+                return cls(json.load(file))
+        except FileNotFoundError:
+            return cls()
+
+    def save(self, path="merchant_rules.json"):
+        with open(path, "w") as file:
+            json.dump(self.rules, file, indent=1)
+
+    def _compile(self):
+        # Descriptions are matched as " key " so " word " patterns only match whole words
+        patterns = []
+        for order, (pattern, category) in enumerate(self.rules.items()):
+            prefix = pattern.endswith("*")
+            words = merchant_key(pattern.rstrip("*"))
+            if words:
+                patterns.append((f" {words}" if prefix else f" {words} ", category, order))
+
+        alphabet = sorted({char for text, _, _ in patterns for char in text} | set("abcdefghijklmnopqrstuvwxyz "))
+        children = [{}]
+        matches = [None]  # Node -> (length, -order, category) of the best pattern ending there
+        for text, category, order in patterns:
+            node = 0
+            for char in text:
+                if char not in children[node]:
+                    children[node][char] = len(children)
+                    children.append({})
+                    matches.append(None)
+                node = children[node][char]
+            candidate = (len(text), -order, category)
+            if matches[node] is None or candidate > matches[node]:
+                matches[node] = candidate
+
+        # Breadth-first, fill in every missing transition from the failure link, turning the trie
+        # into a complete automaton: scanning is one dict lookup per character, without backtracking
+        self.transitions = [None] * len(children)
+        self.transitions[0] = {char: children[0].get(char, 0) for char in alphabet}
+        fail = [0] * len(children)
+        queue = deque(children[0].values())
+        while queue:
+            node = queue.popleft()
+            fallback = self.transitions[fail[node]]
+            if matches[fail[node]] is not None and (matches[node] is None or matches[fail[node]] > matches[node]):
+                matches[node] = matches[fail[node]]  # A pattern that is a suffix of this one
+            transitions = {}
+            for char in alphabet:
+                child = children[node].get(char)
+                if child is None:
+                    transitions[char] = fallback[char]
+                else:
+                    fail[child] = fallback[char]
+                    transitions[char] = child
+                    queue.append(child)
+            self.transitions[node] = transitions
+        self.matches = matches
+        self.memo.clear()
+
+    def add(self, pattern, category):
+        self.rules[pattern] = category
+        self._compile()
+
+    def match(self, description):
+        """Return the category of the best matching rule, or None."""
+        result = self.memo.get(description, False)
+        if result is not False:
+            return result
+        transitions, matches = self.transitions, self.matches
+        best = None
+        node = 0
+        for char in f" {merchant_key(description)} ":
+            node = transitions[node][char]
+            found = matches[node]
+            if found is not None and (best is None or found > best):
+                best = found
+        result = best[2] if best is not None else None
+        if len(self.memo) >= MEMO_SIZE:
+            self.memo.clear()
+        self.memo[description] = result
+        return result
+
+    def categorize(self, descriptions):
+        """Return the matched category or None for every description."""
+        match = self.match
+        return [match(description) for description in descriptions]
@@ -0,0 +1,200 @@
+"""One shared, instrumented Ollama client for the whole project.
+
+Every model call goes through get_client(), which hands out a PooledClient
+wrapping one ollama.Client per (host, timeout). The underlying httpx client
+keeps connections alive, so consecutive requests skip the TCP (and TLS)
+handshake. The host comes from configure(), else OLLAMA_HOST, else Ollama's
+default. Every call is counted and timed in `stats`:
+
+    from ollama_client import get_client, stats
+    get_client(timeout=60).chat(model="llama3.1", messages=[...])
+    print(stats.format_summary())
+"""
+import bisect
+import contextlib
+import os
+import threading
+import time
+
+MAX_KEEPALIVE_CONNECTIONS = 4  # Idle connections kept open per client; a local server serves few at once
+KEEPALIVE_EXPIRY = 60  # Seconds an idle connection stays open
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)  # Upper bounds; the last is open
+
+_lock = threading.Lock()
+_clients = {}  # (host, timeout) -> PooledClient
+_host = None
+
+
+class ClientStats:
+    """Request counters and latency histograms per operation (chat, chat_stream, list, ...)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = {}  # Operation -> count
+            self.errors = {}  # Operation -> count
+            self.histograms = {}  # Operation -> counts per LATENCY_BUCKETS_MS bucket (+1 overflow)
+            self.total_ms = {}  # Operation -> summed latency
+
+    def record(self, operation, seconds, error=False):
+        latency_ms = seconds * 1000
+        with self.lock:
+            self.requests[operation] = self.requests.get(operation, 0) + 1
+            if error:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+            histogram = self.histograms.setdefault(operation, [0] * (len(LATENCY_BUCKETS_MS) + 1))
+            histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            self.total_ms[operation] = self.total_ms.get(operation, 0) + latency_ms
+
+    @contextlib.contextmanager
+    def measure(self, operation):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(operation, time.perf_counter() - started, error=True)
+            raise
+        self.record(operation, time.perf_counter() - started)
+
+    def percentile(self, operation, fraction):
+        """Upper bound (ms) of the bucket holding the given percentile, or None past the last bucket."""
+        with self.lock:
+            histogram = list(self.histograms.get(operation, ()))
+        count = sum(histogram)
+        if not count:
+            return None
+        seen = 0
+        for i, bucket in enumerate(histogram):
+            seen += bucket
+            if seen >= fraction * count:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    def summary(self):
+        with self.lock:
+            operations = sorted(self.requests)
+            rows = {
+                operation: {
+                    "requests": self.requests[operation],
+                    "errors": self.errors.get(operation, 0),
+                    "mean_ms": round(self.total_ms[operation] / self.requests[operation], 1),
+                    "histogram": dict(zip([f"<={bound}" for bound in LATENCY_BUCKETS_MS] + ["more"],
+                                          self.histograms[operation])),
+                }
+                for operation in operations
+            }
+        for operation, row in rows.items():
+            row["p50_ms"] = self.percentile(operation, 0.5)
+            row["p95_ms"] = self.percentile(operation, 0.95)
+        return rows
+
+    def format_summary(self):
+        lines = [f"{'operation':<22}{'requests':>9}{'errors':>8}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}"]
+        for operation, row in self.summary().items():
+            p50 = row["p50_ms"] if row["p50_ms"] is not None else "-"
+            p95 = row["p95_ms"] if row["p95_ms"] is not None else "-"
+            lines.append(
+                f"{operation:<22}{row['requests']:>9}{row['errors']:>8}{row['mean_ms']:>10}{p50:>9}{p95:>9}"
+            )
+        return "\n".join(lines)
+
+
+stats = ClientStats()
+
+
+class PooledClient:
+    """An ollama.Client whose calls are recorded in `stats`.
+
+    Streamed calls are recorded twice, e.g. "chat_first_token" when the first
+    chunk arrives and "chat_stream" when the stream ends, is closed or fails.
+    """
+
+    def __init__(self, client, stats=stats):
+        self.client = client
+        self.stats = stats
+
+    def chat(self, model, messages=None, stream=False, **kwargs):
+        if stream:
+            return self._stream("chat", self.client.chat(model=model, messages=messages, stream=True, **kwargs))
+        with self.stats.measure("chat"):
+            return self.client.chat(model=model, messages=messages, **kwargs)
+
+    def generate(self, model, prompt="", stream=False, **kwargs):
+        if stream:
+            return self._stream("generate", self.client.generate(model=model, prompt=prompt, stream=True, **kwargs))
+        with self.stats.measure("generate"):
+            return self.client.generate(model=model, prompt=prompt, **kwargs)
+
+    def _stream(self, operation, chunks):
+        started = time.perf_counter()
+        first = True
+        error = False
+        try:
+            for chunk in chunks:
+                if first:
+                    self.stats.record(f"{operation}_first_token", time.perf_counter() - started)
+                    first = False
+                yield chunk
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.stats.record(f"{operation}_stream", time.perf_counter() - started, error=error)
+
+    def embed(self, model, input, **kwargs):
+        with self.stats.measure("embed"):
+            return self.client.embed(model=model, input=input, **kwargs)
+
+    def list(self):
+        with self.stats.measure("list"):
+            return self.client.list()
+
+    def ps(self):
+        with self.stats.measure("ps"):
+            return self.client.ps()
+
+    def pull(self, model, stream=False, **kwargs):
+        if stream:
+            return self._stream("pull", self.client.pull(model, stream=True, **kwargs))
+        with self.stats.measure("pull"):
+            return self.client.pull(model, **kwargs)
+
+    def close(self):
+        """Close the pooled HTTP connections; ollama.Client has no public close()."""
+        self.client._client.close()
+
+
+def configure(host=None):
+    """Set the server every client created from now on talks to; None uses OLLAMA_HOST."""
+    global _host
+    with _lock:
+        _host = host
+
+
+def get_client(timeout=None, host=None):
+    """Return the shared client for a host and timeout (seconds, None waits forever)."""
+    host = host or _host or os.environ.get("OLLAMA_HOST")
+    key = (host, timeout)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # ollama (and its HTTP stack) is only imported once the AI is actually used
+            import httpx
+            import ollama
+
+            limits = httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                                  keepalive_expiry=KEEPALIVE_EXPIRY)
+            client = _clients[key] = PooledClient(ollama.Client(host=host, timeout=timeout, limits=limits))
+        return client
+
+
+def close_clients():
+    """Close every pooled connection, e.g. when the application exits."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
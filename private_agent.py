@@ -1,5 +1,8 @@
 import subprocess
-import ollama
+import time
+from conversation import Conversation
+from ollama_client import get_client, stats
+from prompt_pipeline import Pipeline, Step, format_timings
 
 # Function to pull the LLaMA model using Ollama CLI
 # def pull_model(model_name):
@@ -20,15 +23,18 @@ import ollama
 # pull_model("llama3.1")
 
 # Function to generate AI response using the Ollama API
-def generate_response(model, prompt):
-    try:
-        # Call Ollama API to generate response
-        response = ollama.chat(model=model, messages=[{"role": "user", "content": prompt}])
-        return response["message"]["content"]
-    except Exception as e:
-        # Handle any errors during the API call
-        print(f"An error occurred while generating the response: {e}")
-        return None
+def generate_response(model, prompt, conversation=None):
+    """Send a prompt, optionally as the next turn of a conversation whose history is kept in budget.
+
+    Errors are raised so the pipeline can retry the step.
+    """
+    messages = conversation.messages_for(prompt) if conversation else [{"role": "user", "content": prompt}]
+    # Call Ollama API to generate response
+    response = get_client().chat(model=model, messages=messages)
+    content = response["message"]["content"]
+    if conversation is not None:
+        conversation.add_exchange(prompt, content)
+    return content
 
 # Example content for sensitive data; replace with actual data load as needed
 data = """Investing and learning to save are essential skills for financial well-being. 
@@ -40,69 +46,63 @@ The best positions to take in the market based on recent data ... are ..." The b
 # Initial prompt using the loaded data
 prompt_01 = f"{data}"
 
-print("<agent-01> Generating response...")
-
-# Generate the first response about Bitcoin
-response_01_content = generate_response("llama3.1", "Teach me about Bitcoin.")
-if response_01_content:
-    print(response_01_content)
-
-# Build the next prompt based on the first response
-prompt_02 = f"{response_01_content} Now, explain the concept of a 'blockchain' in the context of Bitcoin."
-print("<agent-02> Generating response... Explain the concept of stocks and investments ... Explain the best 3 ways to save and earn money... and the best positions to take in the market based on recent data ...")
-
-# Generate the second response explaining blockchain
-response_02_content = generate_response("llama3.1", prompt_02)
-if response_02_content:
-    print(response_02_content)
-
-# Build the third prompt to explain Bitcoin transaction verification
-prompt_03 = f"{response_02_content} Can you also explain how Bitcoin transactions are verified through cryptography? Can you also explain how to make profitable trades in the stock market based on recent data and news?" 
-print("<agent-03> Generating response...")
-
-# Generate the third response about Bitcoin transaction verification
-response_03_content = generate_response("llama3.1", prompt_03)
-if response_03_content:
-    print(response_03_content)
-
-# Build the fourth prompt to explain Bitcoin mining
-prompt_04 = f"{response_03_content} Finally, can you explain how Bitcoins are created through the process of mining? ... Is it still profatble to invest in Bitcoin mining?"
-print("<agent-04> Generating response...")
-
-# Generate the fourth response about Bitcoin mining
-response_04_content = generate_response("llama3.1", prompt_04)
-if response_04_content:
-    print(response_04_content)
-
-# Adding SOC Analyst and Cybersecurity Talk
-# Prompt about the role of a SOC analyst
-prompt_05 = "Explain the role of a SOC Analyst in cybersecurity."
-print("<agent-05> Generating response...")
-
-response_05_content = generate_response("llama3.1", prompt_05)
-if response_05_content:
-    print(response_05_content)
-
-# Prompt to discuss key responsibilities of a SOC analyst
-prompt_06 = f"{response_05_content} What are the key responsibilities of a SOC Analyst?"
-print("<agent-06> Generating response...")
-
-response_06_content = generate_response("llama3.1", prompt_06)
-if response_06_content:
-    print(response_06_content)
-
-# Prompt about common cybersecurity threats that SOC analysts handle
-prompt_07 = f"{response_06_content} Can you list common cybersecurity threats that SOC Analysts often deal with?"
-print("<agent-07> Generating response...")
-
-response_07_content = generate_response("llama3.1", prompt_07)
-if response_07_content:
-    print(response_07_content)
-
-# Prompt about best practices for cybersecurity incident response
-prompt_08 = f"{response_07_content} What are some best practices for responding to cybersecurity incidents?"
-print("<agent-08> Generating response...")
-
-response_08_content = generate_response("llama3.1", prompt_08)
-if response_08_content:
-    print(response_08_content)
+# Each topic is one conversation. Earlier answers reach the model as chat history, trimmed to a
+# token budget, instead of being pasted into every following prompt.
+bitcoin_chat = Conversation()
+soc_chat = Conversation()
+
+MODEL = "llama3.1"
+MAX_CONCURRENT_PROMPTS = 2  # The two chains run side by side; raise OLLAMA_NUM_PARALLEL to match
+
+
+def prompt_step(name, prompt, conversation, deps=()):
+    """A pipeline step that asks the next question of a conversation and prints the answer."""
+    def run(inputs):
+        response = generate_response(MODEL, prompt, conversation)
+        # Printed in one piece so the output of the two chains does not interleave
+        print(f"<{name}> {prompt}\n{response}\n")
+        return response
+
+    return Step(name, run, deps=deps, retries=2)
+
+
+steps = [
+    # Bitcoin, blockchain, trading and mining
+    prompt_step("agent-01", "Teach me about Bitcoin.", bitcoin_chat),
+    prompt_step(
+        "agent-02", "Now, explain the concept of a 'blockchain' in the context of Bitcoin.",
+        bitcoin_chat, deps=["agent-01"],
+    ),
+    prompt_step(
+        "agent-03",
+        "Can you also explain how Bitcoin transactions are verified through cryptography? Can you also explain how "
+        "to make profitable trades in the stock market based on recent data and news?",
+        bitcoin_chat, deps=["agent-02"],
+    ),
+    prompt_step(
+        "agent-04",
+        "Finally, can you explain how Bitcoins are created through the process of mining? ... Is it still profatble "
+        "to invest in Bitcoin mining?",
+        bitcoin_chat, deps=["agent-03"],
+    ),
+    # Adding SOC Analyst and Cybersecurity Talk; independent of the Bitcoin chain
+    prompt_step("agent-05", "Explain the role of a SOC Analyst in cybersecurity.", soc_chat),
+    prompt_step("agent-06", "What are the key responsibilities of a SOC Analyst?", soc_chat, deps=["agent-05"]),
+    prompt_step(
+        "agent-07", "Can you list common cybersecurity threats that SOC Analysts often deal with?",
+        soc_chat, deps=["agent-06"],
+    ),
+    prompt_step(
+        "agent-08", "What are some best practices for responding to cybersecurity incidents?",
+        soc_chat, deps=["agent-07"],
+    ),
+]
+
+print("Generating responses...")
+started = time.perf_counter()
+results = Pipeline(steps, max_concurrency=MAX_CONCURRENT_PROMPTS).run()
+for result in results.values():
+    if result.status == "failed":
+        print(f"An error occurred while generating the response for <{result.name}>: {result.error}")
+print(format_timings(results, time.perf_counter() - started))
+print(stats.format_summary())
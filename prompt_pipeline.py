@@ -0,0 +1,130 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_MAX_CONCURRENCY = 2  # A local Ollama server handles few requests at once (OLLAMA_NUM_PARALLEL)
+
+
+class Step:
+    """A unit of work in a Pipeline.
+
+    func is called with a dict of the results of the steps named in deps. A step
+    that raises is retried up to `retries` more times, waiting retry_delay
+    seconds (doubled each time) in between.
+    """
+
+    def __init__(self, name, func, deps=(), retries=0, retry_delay=1.0):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+
+class StepResult:
+    def __init__(self, name):
+        self.name = name
+        self.value = None
+        self.error = None
+        self.status = "pending"  # pending, done, failed or skipped (a dependency failed)
+        self.attempts = 0
+        self.started = None
+        self.duration = None
+
+    def __repr__(self):
+        return f"StepResult({self.name!r}, status={self.status!r}, attempts={self.attempts}, duration={self.duration})"
+
+
+class Pipeline:
+    """Runs steps as soon as their dependencies are done, independent branches in parallel.
+
+    With enough workers the wall time is that of the longest dependency chain
+    rather than the sum of all steps. Steps that depend on a failed step are
+    skipped; the rest of the graph still runs.
+    """
+
+    def __init__(self, steps, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.steps = {step.name: step for step in steps}
+        self.max_concurrency = max_concurrency
+        for step in steps:
+            unknown = [dep for dep in step.deps if dep not in self.steps]
+            if unknown:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps: {', '.join(unknown)}")
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through step '{name}'")
+            visiting.add(name)
+            for dep in self.steps[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def _run_step(self, step, result, inputs):
+        delay = step.retry_delay
+        result.started = time.perf_counter()
+        while True:
+            result.attempts += 1
+            try:
+                value = step.func(inputs)
+            except Exception as e:
+                if result.attempts > step.retries:
+                    result.duration = time.perf_counter() - result.started
+                    raise
+                print(f"Step '{step.name}' failed (attempt {result.attempts}): {e}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+            else:
+                result.duration = time.perf_counter() - result.started
+                return value
+
+    def run(self):
+        """Run every step and return {name: StepResult} in declaration order."""
+        results = {name: StepResult(name) for name in self.steps}
+        remaining = dict(self.steps)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="pipeline") as executor:
+            while remaining or running:
+                for name, step in list(remaining.items()):
+                    statuses = [results[dep].status for dep in step.deps]
+                    if any(status in ("failed", "skipped") for status in statuses):
+                        results[name].status = "skipped"
+                        del remaining[name]
+                    elif all(status == "done" for status in statuses):
+                        inputs = {dep: results[dep].value for dep in step.deps}
+                        running[executor.submit(self._run_step, step, results[name], inputs)] = name
+                        del remaining[name]
+
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = results[running.pop(future)]
+                    try:
+                        result.value = future.result()
+                        result.status = "done"
+                    except Exception as e:
+                        result.error = e
+                        result.status = "failed"
+        return results
+
+
+def format_timings(results, wall_time=None):
+    """Return a table of step timings for printing."""
+    lines = [f"{'step':<20}{'status':<10}{'attempts':>9}{'seconds':>10}"]
+    for result in results.values():
+        duration = f"{result.duration:.2f}" if result.duration is not None else "-"
+        lines.append(f"{result.name:<20}{result.status:<10}{result.attempts:>9}{duration:>10}")
+    if wall_time is not None:
+        total = sum(result.duration or 0 for result in results.values())
+        lines.append(f"Wall time {wall_time:.2f}s for {total:.2f}s of step time")
+    return "\n".join(lines)
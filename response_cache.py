@@ -0,0 +1,139 @@
+import collections
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "ai_response_cache.sqlite3"
+DEFAULT_TTL = 24 * 3600  # Seconds a cached response stays valid
+DEFAULT_MAX_ENTRIES = 256  # Responses kept in memory; the disk tier is bounded by the TTL only
+PURGE_EVERY = 500  # put() calls between deletions of expired rows, besides the one when the file opens
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace and case so trivially different prompts share a cache entry."""
+    return re.sub(r"\s+", " ", prompt).strip().casefold()
+
+
+class ResponseCache:
+    """Two-tier cache of model responses: an in-memory LRU in front of a SQLite file.
+
+    Entries are keyed by model, normalized prompt and an optional state string,
+    e.g. BudgetManager.state_hash(), so a changed budget never gets a stale
+    answer. Entries older than `ttl` seconds are ignored, and deleted from the
+    file when it is opened and every PURGE_EVERY puts. The cache is
+    shared between worker threads, so every access holds a lock. Pass path=None
+    for a memory-only cache.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory = collections.OrderedDict()  # key -> (model, created, response), oldest first
+        self.lock = threading.Lock()
+        self.connection = None
+        self.puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model, prompt, state=""):
+        encoded = json.dumps([model, normalize_prompt(prompt), state or ""]).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _db(self):
+        # Opened on first use from whichever worker thread gets there first
+        if self.connection is None and self.path is not None:
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, model TEXT NOT NULL, created REAL NOT NULL, response TEXT NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self.connection.commit()
+            # Every budget change makes new keys, so old answers would otherwise pile up for good
+            self._purge()
+        return self.connection
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, model, prompt, state=""):
+        """Return the cached response, or None on a miss."""
+        key = self.make_key(model, prompt, state)
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is None and self._db() is not None:
+                row = self._db().execute(
+                    "SELECT model, created, response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                entry = tuple(row) if row else None
+
+            if entry is None or self._expired(entry[1]):
+                self.memory.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._remember(key, entry)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, model, prompt, response, state=""):
+        key = self.make_key(model, prompt, state)
+        entry = (model, time.time(), response)
+        with self.lock:
+            self._remember(key, entry)
+            if self._db() is not None:
+                self._db().execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, *entry))
+                self._db().commit()
+            self.puts += 1
+            if self.puts % PURGE_EVERY == 0:
+                self._purge()
+
+    def invalidate(self, model=None):
+        """Drop every cached response, or only those of one model."""
+        with self.lock:
+            if model is None:
+                self.memory.clear()
+            else:
+                for key in [key for key, entry in self.memory.items() if entry[0] == model]:
+                    del self.memory[key]
+            if self._db() is not None:
+                if model is None:
+                    self._db().execute("DELETE FROM responses")
+                else:
+                    self._db().execute("DELETE FROM responses WHERE model = ?", (model,))
+                self._db().commit()
+
+    def purge_expired(self):
+        """Delete expired entries from both tiers and return how many rows left the disk."""
+        with self.lock:
+            return self._purge()
+
+    def _purge(self):
+        # Called with the lock held. A file that is not open yet is purged when _db() opens it
+        if self.ttl is None:
+            return 0
+        cutoff = time.time() - self.ttl
+        for key in [key for key, entry in self.memory.items() if entry[1] < cutoff]:
+            del self.memory[key]
+        if self.connection is None:
+            return 0
+        deleted = self.connection.execute("DELETE FROM responses WHERE created < ?", (cutoff,)).rowcount
+        self.connection.commit()
+        return deleted
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -5,10 +5,15 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import tkinter as tk
 import customtkinter as ctk
 from matplotlib.backend_bases import MouseEvent
-import pandas as pd
+import functools
 import json
 import numpy as np
-import ollama  # Assuming ollama is used in AIChat as per main_gui.py
+from ai_chat import AIChat
+from ai_scheduler import AIScheduler
+from ai_tasks import DEFAULT_TIMEOUT, AIRunner
+from ai_tips import TIP_CATEGORIES, TipPrefetcher, tip_prompts
+from response_cache import ResponseCache
+from budget_core import BudgetManager
 
 # Import statements in main GUI script
 # from features.robinhood_module import login as rh_login, get_portfolio_data, logout as rh_logout
@@ -24,27 +29,22 @@ import ollama  # Assuming ollama is used in AIChat as per main_gui.py
 # Add other calls and integrate these into the relevant parts of the GUI
 
 
-# AIChat Class for interacting with the AI model
-# AIChat Class for interacting with the AI model
-class AIChat:
-    def __init__(self, model_name):
-        self.model_name = model_name
-
-    def generate_response(self, prompt):
-        """Generate a response from the AI model using a prompt."""
-        try:
-            response = ollama.chat(model=self.model_name, messages=[{"role": "user", "content": prompt}])
-            return response["message"]["content"]
-        except Exception as e:
-            return f"An error occurred while generating the response: {e}" 
-
-
-
 class BudgetManagerGUI(ctk.CTk):
     def __init__(self, budget_manager):
         super().__init__()
         self.budget_manager = budget_manager
-        self.ai_chat = AIChat("llama3.1")
+        self.ai_chat = AIChat("llama3.1", timeout=DEFAULT_TIMEOUT, cache=ResponseCache())
+        # Questions and tip prefetches share the model's capacity; questions always go first
+        self.ai_scheduler = AIScheduler()
+        self.ai_runner = AIRunner(self, scheduler=self.ai_scheduler)  # Runs model calls off the Tk thread
+        self.ai_task = None
+        self.ai_streamed_text = ""  # Response received so far while streaming
+        self.waiting_tip = None  # Tip category shown once its background prefetch finishes
+        # Every tip button here, debt included, is generated in the background once the budget settles
+        self.tip_prefetcher = TipPrefetcher(
+            self, self.ai_chat, self.budget_manager, categories=TIP_CATEGORIES, scheduler=self.ai_scheduler
+        )
+        self.tip_prefetcher.start()
         self._apply_appearance_mode("dark")
         self.title("Enhanced Budget Manager with AI Assistance")
         self.geometry("1400x1050")
@@ -331,6 +331,10 @@ class BudgetManagerGUI(ctk.CTk):
 
     def reset_conversation(self):
         """Reset the AI conversation."""
+        if self.ai_task is not None:
+            self.ai_task.cancel()
+            self.ai_task = None
+        self.waiting_tip = None
         self.ai_chat.reset_conversation()
         self.ai_response_label.configure(text="")
 
@@ -398,6 +402,8 @@ class BudgetManagerGUI(ctk.CTk):
 
     def export_to_csv(self):
         """Export financial data to CSV format."""
+        import pandas as pd
+
         try:
             # Convert data to DataFrame
             income_data = pd.DataFrame(list(self.budget_manager.incomes.items()), columns=['Income Source', 'Amount'])
@@ -435,9 +441,61 @@ class BudgetManagerGUI(ctk.CTk):
     def ask_ai(self):
         """Send the user's question to the AI model and display the response."""
         question = self.ai_input_entry.get()
-        response = self.ai_chat.generate_response(question)
-        self.ai_response_box.delete(1.0, tk.END)
-        self.ai_response_box.insert(tk.END, response)
+        if question:
+            self.request_ai(question)
+
+    def request_ai(self, prompt):
+        """Stream the prompt's response into the label, showing "Thinking..." until the first token."""
+        self.waiting_tip = None
+        self.ai_streamed_text = ""
+        self.ai_task = self.ai_runner.submit_stream(
+            self.ai_chat.stream_response, prompt, state=self.budget_manager.state_hash(),
+            on_token=self.append_ai_response,
+            on_done=self.show_ai_response,
+            on_error=lambda error: self.show_ai_response(f"Request failed: {error}"),
+            on_status=self.show_ai_pending,
+            key="answer",  # Replaces the request still waiting for an answer
+        )
+
+    def show_ai_pending(self, task):
+        if task.first_token_at is None:
+            self.ai_response_label.configure(text=f"Thinking... {task.elapsed:.0f}s")
+
+    def append_ai_response(self, text):
+        self.ai_streamed_text += text
+        self.ai_response_label.configure(text=self.ai_streamed_text)
+
+    def show_ai_response(self, text):
+        self.ai_task = None
+        self.ai_response_label.configure(text=text)
+
+    def show_tip(self, category):
+        """Show a tip category, straight from the background prefetch when there is one."""
+        if self.ai_task is not None:
+            self.ai_task.cancel()
+            self.ai_task = None
+        self.waiting_tip = category
+        self.ai_response_label.configure(text="Waiting for the prefetched tip...")
+        if not self.tip_prefetcher.deliver(category, functools.partial(self.display_prefetched_tip, category)):
+            self.request_ai(tip_prompts(self.budget_manager)[category])
+
+    def display_prefetched_tip(self, category, response):
+        if self.waiting_tip != category:
+            return  # Another request was made in the meantime
+        self.waiting_tip = None
+        if response is None:
+            # The prefetch failed or the budget changed while it ran
+            self.request_ai(tip_prompts(self.budget_manager)[category])
+        else:
+            self.ai_response_label.configure(text=response)
+
+    def destroy(self):
+        """Stop the AI requests along with the window."""
+        self.waiting_tip = None  # A tip still waiting must not ask the model again on the way out
+        self.ai_runner.shutdown()
+        self.tip_prefetcher.shutdown()
+        self.ai_scheduler.shutdown()
+        super().destroy()
 
     def on_hover(self, event):
         """Show tooltips when hovering over the chart elements."""
@@ -506,57 +564,23 @@ class BudgetManagerGUI(ctk.CTk):
 
     def get_budget_tips(self):
         """Generate AI tips for budgeting based on current financial data."""
-        prompt = (
-            f"My current monthly income is ${sum(self.budget_manager.incomes.values()):.2f} " 
-            f"and my total expenses are ${sum(sum(exp.values()) for exp in self.budget_manager.expenses.values()):.2f}. "
-            "Can you suggest some tips for better budgeting?"
-
-        )
-        response = self.ai_chat.generate_response(prompt)
-        self.ai_response_label.configure(text=response)
+        self.show_tip("budget")
 
     def get_savings_tips(self):
         """Generate AI tips for savings based on current financial data."""
-        prompt = (
-            f"I save approximately ${self.budget_manager.calculate_monthly_savings():.2f} monthly. "
-            "Can you suggest ways to increase my savings rate?"
-        )
-        response = self.ai_chat.generate_response(prompt)
-        self.ai_response_label.configure(text=response)
+        self.show_tip("savings")
 
     def get_investment_tips(self):
         """Generate AI tips for investments based on current financial data."""
-        prompt = (
-            "Based on my current income and expenses, can you suggest some low-risk investment strategies "
-            "to grow my savings over time?"
-        )
-        response = self.ai_chat.generate_response(prompt)
-        self.ai_response_label.configure(text=response)
+        self.show_tip("investment")
 
     def get_debt_tips(self):
         """Generate AI tips for managing debt based on current financial data."""
-        total_debt = sum(debt["amount"] for debt in self.budget_manager.debts.values())
-        highest_interest = max(self.budget_manager.debts.values(), key=lambda d: d["interest_rate"], default={"interest_rate": 0})
-        prompt = (
-            f"I have a total debt of ${total_debt:.2f} with the highest interest rate being {highest_interest['interest_rate']}%. "
-            "Can you suggest strategies to manage and pay off my debt effectively?"
-        )
-        response = self.ai_chat.generate_response(prompt)
-        self.ai_response_label.configure(text=response)
+        self.show_tip("debt")
 
     def get_retirement_tips(self):
         """Generate AI tips for retirement planning based on current financial data."""
-        current_age = self.budget_manager.age
-        desired_retirement_age = 65  # Example, can be dynamic based on user input
-        current_savings = sum(inv["amount"] for inv in self.budget_manager.investments.values())
-        monthly_savings = self.budget_manager.calculate_monthly_savings()
-        prompt = (
-            f"I am currently {current_age} years old with a savings of ${current_savings:.2f} and save approximately "
-            f"${monthly_savings:.2f} each month. I would like to retire at {desired_retirement_age}. "
-            "Can you provide some tips on how to better prepare for retirement?"
-        )
-        response = self.ai_chat.generate_response(prompt)
-        self.ai_response_label.configure(text=response)
+        self.show_tip("retirement")
 
     def on_hover(self, event):
         """Show tooltips when hovering over the chart elements."""
@@ -643,103 +667,6 @@ class BudgetManagerGUI(ctk.CTk):
 
 
 
-class BudgetManager:
-    def __init__(self, age=0, annual_income=0):
-        self.age = age
-        self.annual_income = annual_income
-        self.monthly_income = annual_income / 12
-        self.expenses = {}  # Now stores expenses grouped by category
-        self.bills = {}
-        self.investments = {}
-        self.debts = {}
-        self.financial_goals = {}
-        self.savings = 0
-        self.incomes = {}  # Dictionary to hold income sources
-
-    def add_income(self, name, amount):
-        """Add an income source to the budget."""
-        self.incomes[name] = amount
-
-    def add_expense(self, name, amount, category):
-        """Add an expense to the budget under a specific category."""
-        if category not in self.expenses:
-            self.expenses[category] = {}
-        self.expenses[category][name] = amount
-
-    def add_bill(self, name, amount):
-        self.bills[name] = amount
-
-    def add_investment(self, name, amount, annual_return_rate):
-        self.investments[name] = {"amount": amount, "rate": annual_return_rate}
-
-    def add_debt(self, name, amount, interest_rate, monthly_payment):
-        self.debts[name] = {
-            "amount": amount,
-            "interest_rate": interest_rate,
-            "monthly_payment": monthly_payment,
-        }
-
-    def add_goal(self, name, target_amount):
-        self.financial_goals[name] = {"target_amount": target_amount, "current_amount": 0}
-
-    def contribute_to_goal(self, name, amount):
-        if name in self.financial_goals:
-            self.financial_goals[name]["current_amount"] += amount
-        else:
-            print(f"Goal '{name}' not found.")
-
-    def calculate_monthly_savings(self):
-        total_expenses = sum(sum(exp.values()) for exp in self.expenses.values())
-        total_bills = sum(self.bills.values())
-        total_debt_payments = sum(debt["monthly_payment"] for debt in self.debts.values())
-        self.savings = self.monthly_income - (total_expenses + total_bills + total_debt_payments)
-        return self.savings
-
-    def estimate_retirement_amount(self, desired_retirement_age):
-        years_until_retirement = desired_retirement_age - self.age
-        if years_until_retirement <= 0:
-            return "You are already at or past your desired retirement age."
-
-        current_savings = sum(inv["amount"] for inv in self.investments.values())
-        estimated_growth = current_savings
-
-        for _ in range(years_until_retirement):
-            estimated_growth += estimated_growth * 0.05  # Assuming 5% annual growth
-
-        return estimated_growth
-
-    def save_data(self, filename="budget_data.json"):
-        data = {
-            "age": self.age,
-            "annual_income": self.annual_income,
-            "expenses": self.expenses,
-            "bills": self.bills,
-            "investments": self.investments,
-            "debits": self.debts,
-            "financial_goals": self.financial_goals,
-            "incomes": self.incomes,
-        }
-        with open(filename, "w") as file:
-            json.dump(data, file, indent=4)
-        print(f"Data saved to {filename}")
-
-    def load_data(self, filename="budget_data.json"):
-        try:
-            with open(filename, "r") as file:
-                data = json.load(file)
-                self.age = data["age"]
-                self.annual_income = data["annual_income"]
-                self.expenses = data["expenses"]
-                self.bills = data["bills"]
-                self.investments = data["investments"]
-                self.debts = data["debits"]
-                self.financial_goals = data["financial_goals"]
-                self.incomes = data["incomes"]
-            print(f"Data loaded from {filename}")
-        except FileNotFoundError:
-            print(f"No data file found with the name {filename}")
-
-
 if __name__ == "__main__":
     # Create BudgetManager instance with default parameters
     budget_manager = BudgetManager(age=30, annual_income=50000)  
@@ -0,0 +1,68 @@
+import threading
+
+from ai_scheduler import PRIORITY_BACKGROUND, AIScheduler
+from ai_tasks import AIRunner
+
+
+def blocker():
+    """Return (func, started, release): func blocks until release is set."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def func():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    return func, started, release
+
+
+def test_background_calls_leave_a_slot_for_interactive_ones():
+    scheduler = AIScheduler(max_concurrent=2, background_limit=1)
+    try:
+        first, first_started, release = blocker()
+        running = scheduler.submit(first, priority=PRIORITY_BACKGROUND)
+        assert first_started.wait(5)
+        waiting = scheduler.submit(lambda: "background", priority=PRIORITY_BACKGROUND)
+        interactive = scheduler.submit(lambda: "interactive")
+
+        # The free worker takes the interactive call; the second background call waits for the first
+        assert interactive.result(5) == "interactive"
+        assert not waiting.done()
+        release.set()
+        assert running.result(5) == "done"
+        assert waiting.result(5) == "background"
+    finally:
+        release.set()
+        scheduler.shutdown()
+
+
+def test_cancelled_queued_call_never_runs():
+    scheduler = AIScheduler(max_concurrent=1)
+    try:
+        first, first_started, release = blocker()
+        running = scheduler.submit(first)
+        assert first_started.wait(5)
+        calls = []
+        queued = scheduler.submit(calls.append, "cancelled")
+        after = scheduler.submit(calls.append, "ran")
+        assert scheduler.pending == 2
+
+        assert queued.cancel()
+        assert scheduler.pending == 1
+        release.set()
+        running.result(5)
+        after.result(5)
+        assert calls == ["ran"]
+    finally:
+        release.set()
+        scheduler.shutdown()
+
+
+def test_runner_with_its_own_scheduler_keeps_a_slot_for_interactive_calls():
+    runner = AIRunner(root=None, max_workers=2)
+    try:
+        assert runner.scheduler.max_concurrent == 2
+        assert runner.scheduler.background_limit == 1
+    finally:
+        runner.scheduler.shutdown()
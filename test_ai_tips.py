@@ -0,0 +1,67 @@
+import threading
+import time
+
+from ai_tips import TipPrefetcher
+from budget_core import BudgetManager
+
+
+class FakeRoot:
+    """Stands in for the Tk root: after() callbacks are only run when the test calls run_pending()."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.ids = 0
+
+    def after(self, ms, func, *args):
+        self.ids += 1
+        self.jobs[self.ids] = (func, args)
+        return self.ids
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for func, args in jobs.values():
+            func(*args)
+
+
+class BlockingChat:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def complete(self, prompt, state=""):
+        self.release.wait(5)
+        return "tip"
+
+
+def prefetcher_with_a_running_tip():
+    root = FakeRoot()
+    chat = BlockingChat()
+    budget = BudgetManager(age=30, annual_income=60000)
+    prefetcher = TipPrefetcher(root, chat, budget, categories=("budget",), max_concurrent=1)
+    prefetcher.prefetch()
+    task = prefetcher.tasks["budget"]
+    deadline = time.monotonic() + 5
+    while not task.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    received = []
+    assert prefetcher.deliver("budget", received.append)
+    return prefetcher, chat, received
+
+
+def test_stop_hands_waiting_callers_none_so_they_can_ask_again():
+    prefetcher, chat, received = prefetcher_with_a_running_tip()
+    try:
+        prefetcher.stop()
+        assert received == [None]
+    finally:
+        chat.release.set()
+        prefetcher.shutdown()
+
+
+def test_shutdown_drops_waiting_callers_without_calling_them():
+    prefetcher, chat, received = prefetcher_with_a_running_tip()
+    prefetcher.shutdown()
+    chat.release.set()
+    assert received == []
@@ -0,0 +1,31 @@
+import json
+import os
+
+from budget_cli import main, profile_names
+from budget_core import BudgetManager
+
+
+def test_profile_names_tell_apart_files_with_the_same_name():
+    paths = [os.path.join("alice", "budget.json"), os.path.join("bob", "budget.json"), "carol.json"]
+    assert profile_names(paths) == ["alice_budget", "bob_budget", "carol"]
+    assert profile_names(["carol.json", "carol.json"]) == ["carol", "carol"]
+
+
+def test_profile_without_expenses_still_gets_its_report_and_charts(tmp_path):
+    for owner in ("alice", "bob"):
+        (tmp_path / owner).mkdir()
+        budget = BudgetManager(age=30, annual_income=60000)
+        if owner == "bob":
+            budget.add_expense("Rent", 1500, "Housing")
+        budget.save_data(str(tmp_path / owner / "budget.json"))
+    output_dir = tmp_path / "reports"
+
+    code = main([str(tmp_path / "alice" / "budget.json"), str(tmp_path / "bob" / "budget.json"),
+                 "--format", "json", "png", "--workers", "1", "--output-dir", str(output_dir)])
+
+    assert code == 0
+    reports = json.loads((output_dir / "budget_report.json").read_text())
+    assert [report["profile"] for report in reports] == ["alice_budget", "bob_budget"]
+    assert reports[0]["total_expenses"] == 0
+    assert all(len(report["charts"]) == 3 and "chart_errors" not in report for report in reports)
+    assert (output_dir / "alice_budget_pie.png").exists()
@@ -0,0 +1,45 @@
+from budget_context import build_budget_context, context_lines
+from budget_core import BudgetManager
+from conversation import estimate_tokens
+
+
+def large_budget():
+    budget = BudgetManager(age=40, annual_income=120000)
+    for i in range(300):
+        budget.add_expense(f"Expense {i}", 10 + i, f"Category {i % 40}")
+    for i in range(20):
+        budget.add_goal(f"Goal {i}", 1000 * (i + 1))
+        budget.add_debt(f"Debt {i}", 5000, 4 + i / 10, 200)
+        budget.add_investment(f"Fund {i}", 10000, 6)
+        budget.add_income(f"Job {i}", 500)
+    return budget
+
+
+def test_context_stays_under_the_token_cap():
+    for max_tokens in (250, 100, 40):
+        assert estimate_tokens(build_budget_context(large_budget(), max_tokens=max_tokens)) <= max_tokens
+
+
+def test_least_important_lines_are_dropped_first():
+    budget = large_budget()
+    lines = context_lines(budget)
+    text = build_budget_context(budget, max_tokens=estimate_tokens("\n".join(lines[:2])))
+    assert text.splitlines() == lines[:2]
+
+
+def test_first_line_is_cut_when_it_alone_is_too_long():
+    text = build_budget_context(large_budget(), max_tokens=5)
+    assert text == context_lines(large_budget())[0][:16]
+
+
+def test_expense_categories_beyond_the_top_n_are_summed():
+    budget = BudgetManager(age=30, annual_income=60000)
+    for i, amount in enumerate((500, 400, 300, 200, 100, 50, 25)):
+        budget.add_expense("Item", amount, f"C{i}")
+    line = next(line for line in context_lines(budget, top_n=3) if line.startswith("Top expenses"))
+    assert line.startswith("Top expenses: C0 $500")
+    assert line.endswith("4 other categories $375 (24%)")
+
+
+def test_equal_budgets_give_the_same_text():
+    assert build_budget_context(large_budget()) == build_budget_context(large_budget())
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from chart_renderer import lttb_downsample, top_categories
+
+
+def test_lttb_keeps_the_end_points_and_returns_threshold_points():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 20)
+    small_x, small_y = lttb_downsample(x, y, 50)
+    assert len(small_x) == len(small_y) == 50
+    assert (small_x[0], small_y[0]) == (x[0], y[0])
+    assert (small_x[-1], small_y[-1]) == (x[-1], y[-1])
+    assert np.all(np.diff(small_x) > 0)
+
+
+def test_lttb_keeps_a_lone_spike():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[321] = 100.0
+    _, small_y = lttb_downsample(x, y, 20)
+    assert small_y.max() == 100.0
+
+
+def test_lttb_leaves_short_series_alone():
+    x, y = [0, 1, 2, 3], [5, 1, 4, 2]
+    small_x, small_y = lttb_downsample(x, y, 10)
+    assert small_x.tolist() == x and small_y.tolist() == y
+
+
+def test_top_categories_folds_the_rest_into_one_bucket():
+    categories = ["Rent", "Food", "Gym", "Books", "Travel"]
+    values = [1500, 400, 50, 30, 700]
+    kept, amounts, folded = top_categories(categories, values, n=3)
+    assert kept == ["Rent", "Travel", "Other (3 categories)"]
+    assert amounts == [1500, 700, 480.0]
+    assert folded == ["Food", "Gym", "Books"]
+    assert sum(amounts) == sum(values)
+
+
+def test_top_categories_keeps_everything_when_n_covers_all():
+    categories = ["Rent", "Food"]
+    assert top_categories(categories, [1500, 400], n=2) == (categories, [1500, 400], [])
+    assert top_categories(categories, [1500, 400], n=10) == (categories, [1500, 400], [])
+
+
+def test_top_categories_with_n_1_is_a_single_bucket():
+    assert top_categories(["a", "b"], [1, 2], n=1) == (["Other (2 categories)"], [3.0], ["a", "b"])
+    with pytest.raises(ValueError):
+        top_categories(["a"], [1], n=0)
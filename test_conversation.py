@@ -0,0 +1,52 @@
+from conversation import Conversation, estimate_tokens
+
+
+def exchange(i, size=200):
+    return f"question {i} " + "x" * size, f"answer {i} " + "y" * size
+
+
+def test_history_is_trimmed_below_the_budget_in_one_go():
+    conversation = Conversation(system_prompt="You are helpful.", max_tokens=400, trim_to=0.5)
+    for i in range(5):
+        conversation.add_exchange(*exchange(i))
+        assert conversation.token_count() <= 400
+    # Trimming drops whole exchanges, oldest first, down to trim_to of the budget
+    contents = [message["content"] for message in conversation.messages()]
+    assert contents[0] == "You are helpful."
+    assert contents[-2:] == list(exchange(4))
+    assert all(not content.startswith("question 0") for content in contents)
+    assert len(conversation.turns) % 2 == 0
+
+
+def test_the_latest_exchanges_are_kept_even_over_budget():
+    conversation = Conversation(max_tokens=50, keep_recent=1)
+    conversation.add_exchange(*exchange(0, size=400))
+    conversation.add_exchange(*exchange(1, size=400))
+    assert [message["content"] for message in conversation.messages()] == list(exchange(1, size=400))
+
+
+def test_dropped_exchanges_are_folded_into_the_summary():
+    calls = []
+
+    def summarize(summary, dropped):
+        calls.append(dropped)
+        return f"{summary}+{len(dropped)}"
+
+    conversation = Conversation(system_prompt="Base.", max_tokens=200, summarize=summarize)
+    for i in range(4):
+        conversation.add_exchange(*exchange(i))
+    assert calls and all(len(dropped) % 2 == 0 for dropped in calls)
+    system = conversation.messages()[0]["content"]
+    assert system.startswith("Base.\n\nSummary of the earlier conversation:\n")
+
+
+def test_a_per_turn_system_prompt_does_not_replace_the_stored_one():
+    conversation = Conversation(system_prompt="Base.")
+    messages = conversation.messages_for("Hi", system_prompt="Ledger context.")
+    assert messages == [{"role": "system", "content": "Ledger context."}, {"role": "user", "content": "Hi"}]
+    assert conversation.messages_for("Hi")[0]["content"] == "Base."
+
+
+def test_estimate_tokens_grows_with_the_text():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 101
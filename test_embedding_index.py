@@ -0,0 +1,53 @@
+from budget_context import build_budget_context
+from budget_core import BudgetManager
+from embedding_index import EmbeddingIndex, ledger_documents
+
+
+def full_budget():
+    budget = BudgetManager(age=30, annual_income=72000)
+    budget.add_income("Salary", 6000)
+    budget.add_expense("Groceries", 450, "Food")
+    budget.add_expense("Rent", 1800, "Housing")
+    budget.add_bill("Phone", 60)
+    budget.add_investment("Index fund", 20000, 7)
+    budget.add_debt("Car loan", 9000, 5.5, 300)
+    budget.add_goal("Emergency fund", 10000)
+    budget.contribute_to_goal("Emergency fund", 2500)
+    return budget
+
+
+def test_ledger_documents_cover_every_entry_type():
+    documents = ledger_documents(full_budget())
+    assert documents["income:Salary"] == "Income source 'Salary': $6,000 per month"
+    assert documents["expense:Food:Groceries"] == "Expense 'Groceries' in category Food: $450 per month"
+    assert documents["category:Housing"] == "Category Housing: $1,800 per month over 1 expenses"
+    assert documents["bill:Phone"] == "Bill 'Phone': $60 per month"
+    assert documents["investment:Index fund"] == "Investment 'Index fund': $20,000 at 7% annual return"
+    assert documents["debt:Car loan"] == "Debt 'Car loan': $9,000 at 5.5% interest, paying $300 per month"
+    assert documents["goal:Emergency fund"] == "Goal 'Emergency fund': $2,500 saved of $10,000"
+
+
+def test_budget_context_includes_the_retirement_projection():
+    assert "at age 65" in build_budget_context(full_budget(), max_tokens=1000)
+
+
+def fake_embed(texts):
+    # One dimension per letter a-e, so texts sharing letters score higher
+    return [[text.count(letter) + 0.01 for letter in "abcde"] for text in texts]
+
+
+def test_sync_only_embeds_new_or_changed_texts_and_drops_removed_keys():
+    embedded = []
+    index = EmbeddingIndex(lambda texts: embedded.extend(texts) or fake_embed(texts), initial_capacity=1)
+    assert index.sync({"a": "aaa", "b": "bbb", "c": "ccc"}) == 3
+    assert index.sync({"a": "aaa", "b": "bbbb"}) == 1
+    assert embedded == ["aaa", "bbb", "ccc", "bbbb"]
+    assert sorted(index.rows) == ["a", "b"]
+
+
+def test_search_ranks_by_similarity_and_handles_small_k():
+    index = EmbeddingIndex(fake_embed)
+    index.sync({"a": "aaaa", "b": "bbbb", "ab": "aabb"})
+    assert [key for _, key, _ in index.search("aaa", k=2)] == ["a", "ab"]
+    assert len(index.search("aaa", k=10)) == 3
+    assert index.search("aaa", k=0) == []
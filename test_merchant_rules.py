@@ -0,0 +1,31 @@
+from merchant_rules import MerchantRules
+
+
+def test_patterns_match_whole_words_only():
+    rules = MerchantRules({"rent": "Housing"})
+    assert rules.match("RENT PAYMENT 0412") == "Housing"
+    assert rules.match("PARENT TEACHER ASSOC") is None
+    assert rules.match("RENTAL CAR") is None
+
+
+def test_trailing_star_matches_word_prefixes():
+    rules = MerchantRules({"amzn*": "Others"})
+    assert rules.match("AMZN MKTP US*2K3") == "Others"
+    assert rules.match("AMZNPRIME 555-1234") == "Others"
+    assert rules.match("PAY AMAZON") is None
+    assert rules.match("XAMZN") is None
+
+
+def test_longest_match_wins_then_first_listed():
+    rules = MerchantRules({"shell": "Transportation", "shell oil station": "Utilities", "oil": "Housing"})
+    assert rules.match("SHELL OIL STATION 57") == "Utilities"
+    assert rules.match("SHELL 57") == "Transportation"
+    tied = MerchantRules({"uber": "Transportation", "eats": "Food"})
+    assert tied.match("UBER EATS") == "Transportation"
+
+
+def test_add_recompiles_and_forgets_memoized_results():
+    rules = MerchantRules({})
+    assert rules.match("NETFLIX.COM") is None
+    rules.add("netflix", "Entertainment")
+    assert rules.match("NETFLIX.COM") == "Entertainment"
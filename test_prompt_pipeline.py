@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from prompt_pipeline import Pipeline, Step
+
+
+def test_steps_get_their_dependencies_results_and_run_after_them():
+    order = []
+    lock = threading.Lock()
+
+    def step(name, value):
+        def func(inputs):
+            with lock:
+                order.append(name)
+            return value + sum(inputs.values())
+        return func
+
+    results = Pipeline([
+        Step("total", step("total", 0), deps=("left", "right")),
+        Step("left", step("left", 1), deps=("root",)),
+        Step("right", step("right", 2), deps=("root",)),
+        Step("root", step("root", 10)),
+    ], max_concurrency=2).run()
+
+    assert list(results) == ["total", "left", "right", "root"]
+    assert results["total"].value == 11 + 12
+    assert order[0] == "root" and order[-1] == "total"
+    assert all(result.status == "done" for result in results.values())
+
+
+def test_independent_steps_run_in_parallel():
+    barrier = threading.Barrier(2, timeout=5)
+    results = Pipeline([Step("a", lambda inputs: barrier.wait()), Step("b", lambda inputs: barrier.wait())],
+                       max_concurrency=2).run()
+    assert results["a"].status == results["b"].status == "done"
+
+
+def test_a_failure_skips_its_dependents_but_not_the_rest():
+    def fail(inputs):
+        raise RuntimeError("model unavailable")
+
+    results = Pipeline([
+        Step("broken", fail),
+        Step("after_broken", lambda inputs: "never", deps=("broken",)),
+        Step("last", lambda inputs: "never", deps=("after_broken",)),
+        Step("independent", lambda inputs: "ok"),
+    ]).run()
+
+    assert results["broken"].status == "failed"
+    assert str(results["broken"].error) == "model unavailable"
+    assert results["after_broken"].status == results["last"].status == "skipped"
+    assert results["last"].attempts == 0
+    assert results["independent"].value == "ok"
+
+
+def test_failed_steps_are_retried():
+    attempts = []
+
+    def flaky(inputs):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("try again")
+        return "ok"
+
+    result = Pipeline([Step("flaky", flaky, retries=2, retry_delay=0)]).run()["flaky"]
+    assert (result.status, result.value, result.attempts) == ("done", "ok", 3)
+
+
+def test_unknown_dependencies_and_cycles_are_rejected():
+    with pytest.raises(ValueError, match="unknown"):
+        Pipeline([Step("a", lambda inputs: 1, deps=("missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        Pipeline([Step("a", lambda inputs: 1, deps=("b",)), Step("b", lambda inputs: 1, deps=("a",))])
@@ -0,0 +1,68 @@
+import sqlite3
+import time
+
+import response_cache
+from response_cache import ResponseCache
+
+
+def test_prompts_differing_in_case_and_whitespace_share_an_entry():
+    cache = ResponseCache(path=None)
+    cache.put("llama3.1", "How  much do I\nspend?", "A lot", state="v1")
+    assert cache.get("llama3.1", "how much do i spend?", state="v1") == "A lot"
+    assert cache.get("llama3.1", "how much do i spend?", state="v2") is None
+    assert cache.get("other-model", "how much do i spend?", state="v1") is None
+
+
+def test_least_recently_used_entry_leaves_memory_first():
+    cache = ResponseCache(path=None, max_entries=2)
+    cache.put("m", "a", "A")
+    cache.put("m", "b", "B")
+    assert cache.get("m", "a") == "A"  # Now "b" is the least recently used
+    cache.put("m", "c", "C")
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == "A"
+    assert cache.get("m", "c") == "C"
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = ResponseCache(path=None, ttl=60)
+    cache.put("m", "prompt", "answer")
+    now[0] += 59
+    assert cache.get("m", "prompt") == "answer"
+    now[0] += 2
+    assert cache.get("m", "prompt") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disk_tier_survives_a_restart_and_drops_expired_rows_when_opened(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite3")
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = ResponseCache(path, ttl=60)
+    cache.put("m", "old", "stale")
+    now[0] += 50
+    cache.put("m", "new", "fresh")
+    cache.close()
+
+    now[0] += 20  # "old" is 70 seconds old, "new" 20
+    reopened = ResponseCache(path, ttl=60)
+    assert reopened.get("m", "new") == "fresh"
+    reopened.close()
+    rows = sqlite3.connect(path).execute("SELECT response FROM responses").fetchall()
+    assert rows == [("fresh",)]
+
+
+def test_expired_rows_are_deleted_every_purge_every_puts(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, "PURGE_EVERY", 3)
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.put("m", "a", "A")
+    now[0] += 100
+    cache.put("m", "b", "B")
+    assert cache.connection.execute("SELECT COUNT(*) FROM responses").fetchone() == (2,)
+    cache.put("m", "c", "C")
+    assert cache.connection.execute("SELECT COUNT(*) FROM responses").fetchone() == (2,)
+    cache.close()